@@ -0,0 +1,316 @@
+"""가상 참가자/조장 데이터 생성기와 조 배정 벤치마크.
+
+실제 개인정보 없이 배정 엔진의 속도와 품질을 재기 위한 스크립트입니다.
+
+    python bench.py generate --members 3000 --groups 60 --year 2026 --out sample/
+    python bench.py run --scenario small medium --repeats 3 --json bench.json
+    python bench.py run --baseline bench.json      # 이전 결과와 시간 비교
+    python bench.py startup --repeats 10           # 시작(임포트) 시간 측정
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from dataclasses import dataclass, asdict, replace, fields
+
+import numpy as np
+import pandas as pd
+
+import main
+from main import console, run_assignment
+
+# ==========================================
+# 1. 가상 데이터 생성
+# ==========================================
+
+SURNAMES = list('김이박최정강조윤장임한오서신권황안송류홍')
+SYLLABLES = list('민서지하도예수윤준우현유진시은주원채연승태경소다나영재건희')
+COMMON_GIVEN = ['민준', '서연', '지훈', '서윤', '도윤', '지우', '하준', '하은', '시우', '지민',
+                '예준', '수아', '주원', '지유', '유진', '서준', '채원', '현우', '지아', '건우']
+
+@dataclass
+class Scenario:
+    """생성할 가상 새터 한 회분의 설정."""
+    name: str = 'custom'
+    members: int = 400
+    groups: int = 20
+    year: int = 2026
+    male_ratio: float = 0.65         # 남자 비율
+    majors: str = '도전탐색과정=85,반도체공학과=15'   # 학과=비중,...
+    birth_spread: int = 4             # 현역(행사 연도-19년생)보다 나이 많은 참가자가 퍼지는 햇수
+    older_ratio: float = 0.3          # 현역이 아닌 참가자 비율
+    new_cam_size: float = 20.0        # 신캠조 하나의 평균 인원
+    name_clash: float = 0.1           # 흔한 이름(동명이인 후보) 비율
+    leader_ages: str = '20-23'        # 조장 나이 범위 (행사 연도 기준 만 나이 + 1)
+    seed: int = 0
+
+SCENARIOS = {
+    'small':  Scenario('small', members=300, groups=10),
+    'default': Scenario('default', members=400, groups=20),
+    'skewed': Scenario('skewed', members=600, groups=20, male_ratio=0.85, older_ratio=0.5,
+                       birth_spread=8, name_clash=0.3, majors='도전탐색과정=60,반도체공학과=30,AI융합학과=10'),
+    'medium': Scenario('medium', members=3000, groups=60),
+    'large':  Scenario('large', members=20000, groups=400, new_cam_size=25),
+    'huge':   Scenario('huge', members=100000, groups=1000, new_cam_size=30),
+}
+
+def parse_mix(text):
+    # '도전탐색과정=85,반도체공학과=15' -> (['도전탐색과정', '반도체공학과'], [0.85, 0.15])
+    names, weights = [], []
+    for part in text.split(','):
+        key, _, value = part.partition('=')
+        names.append(key.strip())
+        weights.append(float(value or 1))
+    weights = np.array(weights)
+    return names, weights / weights.sum()
+
+def unique_given_names(count, rng):
+    # 음절 조합으로 겹치지 않는 이름을 필요한 만큼 (2음절 → 3음절 순으로) 생성
+    syl = np.array(SYLLABLES)
+    names, length = [], 2
+    while len(names) < count:
+        combos = np.array(np.meshgrid(*[syl] * length, indexing='ij')).reshape(length, -1)
+        batch = [''.join(c) for c in combos.T]
+        rng.shuffle(batch)
+        names.extend(n for n in batch if n not in COMMON_GIVEN)
+        length += 1
+    return np.array(names[:count], dtype=object)
+
+def generate_cohort(sc):
+    """시나리오대로 (조장 DataFrame, 참가자 DataFrame)을 만듭니다. 열 구성은 README의 예시 파일과 같습니다."""
+    rng = np.random.default_rng(sc.seed)
+    n, g = sc.members, sc.groups
+
+    # 조장: 조마다 두 명, 행사 연도 기준 leader_ages 범위의 나이
+    lo, hi = (int(v) for v in sc.leader_ages.split('-'))
+    leader_years = sc.year - rng.integers(lo, hi + 1, size=(g, 2))
+    leaders = pd.DataFrame({
+        '조 번호': np.arange(1, g + 1),
+        '조장1 이름': rng.choice(SURNAMES, g) + rng.choice(COMMON_GIVEN, g),
+        '조장1의 생년': leader_years[:, 0],
+        '조장2 이름': rng.choice(SURNAMES, g) + rng.choice(COMMON_GIVEN, g),
+        '조장2의 생년': leader_years[:, 1],
+    })
+
+    # 생년: 현역 + 나이 많은 참가자는 1년차일수록 많게 (기하 분포)
+    extra = np.where(rng.random(n) < sc.older_ratio,
+                     np.minimum(rng.geometric(0.55, n), max(sc.birth_spread, 1)), 0)
+    birth = sc.year - 19 - extra
+    month, day = rng.integers(1, 13, n), rng.integers(1, 29, n)
+
+    male = rng.random(n) < sc.male_ratio
+    digit = np.where(birth >= 2000, 3, 1) + ~male   # 주민번호 뒷자리 첫 숫자 (1/2, 3/4)
+    rrn = pd.Series([f"{y % 100:02d}{m:02d}{d:02d}-{k}000000" for y, m, d, k in zip(birth, month, day, digit)])
+
+    # 이름: name_clash 비율만큼 흔한 이름, 나머지는 겹치지 않는 이름
+    given = unique_given_names(n, rng)
+    common = rng.random(n) < sc.name_clash
+    given[common] = rng.choice(COMMON_GIVEN, common.sum())
+    names = rng.choice(SURNAMES, n).astype(object) + given
+
+    major_names, major_p = parse_mix(sc.majors)
+    new_cam_count = max(1, round(n / sc.new_cam_size))
+
+    freshmen = pd.DataFrame({
+        '성명': names,
+        '출신고교명': pd.Series(rng.integers(1, 300, n)).map('지스트고{}'.format),
+        '신캠조': rng.integers(1, new_cam_count + 1, n),
+        '학과/학부': np.array(major_names, dtype=object)[rng.choice(len(major_names), n, p=major_p)],
+        '성별': np.where(male, '남자', '여자'),
+        '전화번호': pd.Series(rng.integers(0, 10 ** 8, n)).map('010{:08d}'.format),
+        '주민등록번호': rrn,
+    })
+    return leaders, freshmen
+
+def write_cohort(leaders, freshmen, out_dir, year, fmt='xlsx'):
+    # main.py가 찾는 이름('연도ST_leader.xlsx' 등)으로 저장
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for stem, df in ((f"{year}ST_leader", leaders), (f"{year}ST_freshmen", freshmen)):
+        path = os.path.join(out_dir, f"{stem}.{fmt}")
+        if fmt == 'csv':
+            df.to_csv(path, index=False, encoding='utf-8-sig')
+        elif fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+# ==========================================
+# 2. 벤치마크 실행
+# ==========================================
+
+def run_scenario(sc, repeats=3, fmt='csv', **options):
+    """시나리오 하나를 seed 0..repeats-1로 반복 배정하고 시간/시도 횟수/성공률/균형 지표를 모읍니다."""
+    leaders, freshmen = generate_cohort(sc)
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        leader_file, member_file = write_cohort(leaders, freshmen, tmp, sc.year, fmt)
+        for seed in range(repeats):
+            start = time.perf_counter()
+            result = run_assignment(leader_file, member_file, seed=seed, save=False, cache_dir=None, **options)
+            run = {'seed': seed, 'wall': time.perf_counter() - start, 'success': result['success'],
+                   'attempts': result.get('attempts'), 'assign_seconds': result.get('seconds'),
+                   'score': result.get('score')}
+            if result['success']:
+                run.update(result['metrics'])
+            runs.append(run)
+
+    ok = [r for r in runs if r['success']]
+    summary = {
+        'scenario': asdict(sc),
+        'success_rate': len(ok) / len(runs),
+        'wall_mean': float(np.mean([r['wall'] for r in runs])),
+        'assign_mean': float(np.mean([r['assign_seconds'] for r in runs])),
+        'attempts_mean': float(np.mean([r['attempts'] for r in ok])) if ok else None,
+        'runs': runs,
+    }
+    for key in ('score', 'size_spread', 'male_spread', 'female_spread', 'gender_ratio_dev', 'major_entropy_min',
+                'birth_mean_spread', 'new_cam_singletons', 'age_violations', 'name_clashes'):
+        summary[key] = float(np.mean([r[key] for r in ok])) if ok else None
+    return summary
+
+def print_report(results, baseline=None):
+    base = {r['scenario']['name']: r for r in (baseline or {}).get('results', [])}
+    table = main.Table(title="⏱️ [bold]조 배정 벤치마크[/bold]", border_style="cyan", header_style="bold white on dark_green")
+    for col in ('시나리오', '인원/조', '성공률', '시도', '배정(초)', '전체(초)', '점수',
+                '총원/남/여 편차', '학과 엔트로피', '신캠 1명', '나이 위반'):
+        table.add_column(col, justify="center")
+
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    for r in results:
+        sc = r['scenario']
+        timing = fmt(r['assign_mean'], '.2f')
+        prev = base.get(sc['name'])
+        if prev and prev['assign_mean']:
+            ratio = r['assign_mean'] / prev['assign_mean']
+            color = 'red' if ratio > 1.1 else 'green' if ratio < 0.9 else 'dim'
+            timing += f" [{color}]({ratio:.2f}x)[/{color}]"
+        table.add_row(
+            sc['name'], f"{sc['members']:,}/{sc['groups']}", f"{r['success_rate']:.0%}",
+            fmt(r['attempts_mean'], '.1f'), timing, fmt(r['wall_mean'], '.2f'), fmt(r['score'], ',.0f'),
+            '/'.join(fmt(r[k], '.1f') for k in ('size_spread', 'male_spread', 'female_spread')),
+            fmt(r['major_entropy_min'], '.2f'), fmt(r['new_cam_singletons'], '.1f'), fmt(r['age_violations'], '.1f'),
+        )
+    console.print(table)
+
+# ------------------------------------------
+# 시작 시간
+# ------------------------------------------
+# 짧은 일괄 실행과 병렬 워커는 매번 main.py를 새로 불러오므로, pandas/numpy 없이 뜨는 시간을 따로 잽니다.
+STARTUP_TARGET = 0.25    # 초: 새 프로세스에서 `import main`까지 (인터프리터 기동 포함, 중앙값)
+STARTUP_CASES = {
+    'python': ['-c', 'pass'],
+    'import main': ['-c', 'import main'],
+    'main.py --help': ['main.py', '--help'],
+    'import main + pandas': ['-c', 'import main; main.pd.DataFrame'],
+}
+
+def measure_startup(repeats=10):
+    """각 경우를 새 프로세스로 repeats번 실행해 걸린 시간(초)의 중앙값/최솟값을 잽니다."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, args in STARTUP_CASES.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], cwd=here, check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        results[name] = {'median': statistics.median(times), 'min': min(times)}
+    return results
+
+def print_startup(results, target):
+    table = main.Table(title="🚀 [bold]시작 시간[/bold]", border_style="cyan", header_style="bold white on dark_green")
+    for col in ('경우', '중앙값(초)', '최소(초)'):
+        table.add_column(col, justify="center")
+    for name, r in results.items():
+        median = f"{r['median']:.3f}"
+        if name == 'import main':
+            color = 'green' if r['median'] <= target else 'red'
+            median = f"[{color}]{median}[/{color}] (목표 {target:.2f})"
+        table.add_row(name, median, f"{r['min']:.3f}")
+    console.print(table)
+
+# ==========================================
+# 3. CLI
+# ==========================================
+
+def add_scenario_args(parser):
+    defaults = Scenario()
+    for f in fields(Scenario):
+        if f.name == 'name':
+            continue
+        parser.add_argument('--' + f.name.replace('_', '-'), type=type(getattr(defaults, f.name)), default=None,
+                            help=f"기본 {getattr(defaults, f.name)}")
+
+def scenario_from_args(args, base):
+    overrides = {f.name: getattr(args, f.name) for f in fields(Scenario)
+                 if f.name != 'name' and getattr(args, f.name) is not None}
+    return replace(base, **overrides)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bench.py', description='가상 데이터 생성 및 조 배정 벤치마크')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', help='가상 조장/참가자 파일 생성')
+    gen.add_argument('--scenario', choices=sorted(SCENARIOS), default='default', help='기본값으로 쓸 시나리오')
+    gen.add_argument('--out', default='.', help='저장 폴더 (기본: 현재 폴더)')
+    gen.add_argument('--format', choices=['xlsx', 'csv', 'parquet'], default='xlsx')
+    add_scenario_args(gen)
+
+    run = sub.add_parser('run', help='시나리오별로 배정을 반복 실행하고 결과 비교')
+    run.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=['small', 'default', 'skewed', 'medium'])
+    run.add_argument('--repeats', type=int, default=3, help='시나리오마다 반복 횟수 (seed 0부터)')
+    run.add_argument('--max-retries', type=int, default=2000)
+    run.add_argument('--workers', type=int, default=1, help='병렬 프로세스 수 (0: 모든 코어)')
+    run.add_argument('--refine-seconds', type=float, default=0.0)
+    run.add_argument('--json', metavar='PATH', help='결과를 JSON으로 저장 (회귀 비교용)')
+    run.add_argument('--baseline', metavar='PATH', help='이전 --json 결과와 배정 시간 비교')
+
+    start = sub.add_parser('startup', help='main.py 시작(임포트) 시간 측정')
+    start.add_argument('--repeats', type=int, default=10)
+    start.add_argument('--target', type=float, default=STARTUP_TARGET, help=f"`import main` 목표 시간(초), 기본 {STARTUP_TARGET}")
+    start.add_argument('--json', metavar='PATH', help='결과를 JSON으로 저장')
+    return parser
+
+def main_cli(argv):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'generate':
+        sc = scenario_from_args(args, SCENARIOS[args.scenario])
+        leaders, freshmen = generate_cohort(sc)
+        for path in write_cohort(leaders, freshmen, args.out, sc.year, args.format):
+            console.print(f"[success]✔[/success] {path}")
+        return 0
+
+    if args.command == 'startup':
+        results = measure_startup(args.repeats)
+        print_startup(results, args.target)
+        if args.json:
+            main.write_json({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'target': args.target, 'results': results}, args.json)
+        return 0 if results['import main']['median'] <= args.target else 1
+
+    results = []
+    for name in args.scenario:
+        with console.status(f"[bold green]{name} 시나리오 실행 중...[/bold green]"):
+            results.append(run_scenario(SCENARIOS[name], args.repeats, max_retries=args.max_retries,
+                                        workers=args.workers, refine_seconds=args.refine_seconds))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json:
+        main.write_json({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results}, args.json)
+    return 0 if all(r['success_rate'] == 1 for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main_cli(sys.argv[1:]))
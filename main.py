@@ -1,36 +1,54 @@
 import sys
-import subprocess
 import os
+import json
+import glob
+import pickle
+import hashlib
+import importlib
+import itertools
+import heapq
+import argparse
 import time
+import math
 import random
+import signal
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 
 # ==========================================
-# 0. 라이브러리 자동 설치 및 임포트
+# 0. 라이브러리 임포트
 # ==========================================
-def install_and_import(package):
+# pandas/numpy는 불러오는 데만 0.5초 가까이 걸립니다. 약관 화면, --help, 짧은 일괄 실행이 이를 기다리지 않도록
+# 처음 쓰는 순간에 불러옵니다. 라이브러리를 자동으로 설치하지는 않습니다. (pip install -r requirements.txt)
+class LazyModule:
+    """처음 속성에 접근할 때 모듈을 불러오고, 이 파일의 전역 이름을 실제 모듈로 바꿔 이후에는 비용이 없습니다."""
+    def __init__(self, alias, name):
+        self._alias, self._name = alias, name
+
+    def __getattr__(self, attr):
+        module = require_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+def require_module(name, package=None):
+    # package: 필수 목록(requirements.txt)에 없는 선택 라이브러리면 설치할 패키지 이름
     try:
-        __import__(package)
-    except ImportError:
-        print(f"📦 '{package}' 라이브러리가 없습니다. 자동으로 설치합니다...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-
-# 필수 라이브러리 체크 및 설치
-required_packages = ['pandas', 'openpyxl', 'rich']
-for package in required_packages:
-    install_and_import(package)
-
-import pandas as pd
-import numpy as np
+        return importlib.import_module(name)
+    except ImportError as e:
+        command = f"pip install {package}" if package else "pip install -r requirements.txt"
+        raise ImportError(f"'{name}' 라이브러리가 없습니다. '{command}'로 설치한 뒤 다시 실행해주세요.") from e
+
+pd = LazyModule('pd', 'pandas')
+np = LazyModule('np', 'numpy')
+
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.theme import Theme
-from rich.status import Status
-from rich.prompt import Prompt
 from rich import box
-from rich.align import Align
 
 # 사용자 설정 테마 (cyan, yellow, magenta 등 원본 유지 + 헤더만 dark_green)
 custom_theme = Theme({
@@ -47,32 +65,6 @@ console = Console(theme=custom_theme)
 # 1. 스마트 데이터 처리 함수
 # ==========================================
 
-def smart_get_year(value):
-    try:
-        if hasattr(value, 'year'): return value.year
-        val_str = str(value).strip()
-        if not val_str or val_str.lower() == 'nan': return 0
-        if len(val_str) == 4 and val_str.isdigit(): return int(val_str)
-        if '-' in val_str or len(val_str) == 6:
-            if '-' in val_str: prefix = val_str.split('-')[0]
-            else: prefix = val_str[:6]
-            yy = int(prefix[:2])
-            if 0 <= yy <= 30: return 2000 + yy
-            else: return 1900 + yy
-        return int(float(val_str))
-    except: return 0 
-
-def format_phone_number(value):
-    try:
-        s = str(value).strip()
-        if not s or s.lower() == 'nan': return ""
-        if s.endswith('.0'): s = s[:-2]
-        s = s.replace('-', '').replace(' ', '').replace('.', '')
-        if len(s) == 10 and s.startswith('1'): s = '0' + s
-        if len(s) == 11: return f"{s[:3]}-{s[3:7]}-{s[7:]}"
-        return s
-    except: return value
-
 def format_gender_output(value):
     s = str(value).strip()
     if s in ['남자', '남', 'Male', 'M', 'Man']: return '남자'
@@ -88,66 +80,1344 @@ def normalize_gender(value):
     if '여' in s or 'Woman' in s or 'Female' in s or 'F' in s: return '여'
     return s
 
-def get_name_key(name):
-    name = str(name).strip()
-    if len(name) > 1: return name[1:] 
-    return name
+# ------------------------------------------
+# 입력 파일 읽기 (엑셀 / CSV / Parquet)
+# ------------------------------------------
 
-# limits_config를 받도록 업데이트된 함수
-def calculate_score(group_id, member, group_status, constraints, weights, ignore_age=False, limits_config=None):
-    leader_min_year = constraints['leader_years'].get(group_id, 0)
-    
-    # 0. 정밀한 인원/성비 제한 체크 (limits_config 사용)
-    if limits_config:
-        # 1) 총원 체크
-        if group_status[group_id]['count'] >= limits_config['total']:
-            return -float('inf')
-        
-        # 2) 성별 체크
-        my_gender = member['gender']
-        current_gender_cnt = group_status[group_id]['genders'].get(my_gender, 0)
-        
-        if my_gender == '남':
-            if current_gender_cnt >= limits_config['male']: return -float('inf')
-        elif my_gender == '여':
-            if current_gender_cnt >= limits_config['female']: return -float('inf')
-
-    # 1. 조장 나이 제한
-    if not ignore_age:
-        if leader_min_year > 0 and member['birth_year'] < leader_min_year:
-            return -float('inf')
-
-    # 2. 동명이인 제한
-    if member['name_key'] in group_status[group_id]['names']:
-        return -float('inf')
-
-    # 3. 신캠조 인원 제한
-    nc_count = group_status[group_id]['new_cam'].get(member['new_cam'], 0)
-    if nc_count >= 3:
-        return -float('inf')
-
-    # 4. 점수 계산
-    score = 0
-    current_size = group_status[group_id]['count']
-    score -= current_size * weights['size'] 
-    
-    gender_count = group_status[group_id]['genders'].get(member['gender'], 0)
-    score -= gender_count * weights['gender']
-    
-    major_count = group_status[group_id]['majors'].get(member['major'], 0)
-    score -= major_count * weights['major']
-    
-    by_count = group_status[group_id]['birth_years'].get(member['birth_year'], 0)
-    score -= by_count * weights['birth_year']
-    
-    if nc_count == 1: score += weights['new_cam_cluster_bonus'] 
-    elif nc_count > 0: score += weights['new_cam_exist_bonus']
-    else: score -= weights['new_cam_scatter_penalty']
+INPUT_EXTENSIONS = ('.xlsx', '.csv', '.parquet')
+CACHE_VERSION = 1  # 파싱 규칙이 바뀌면 올려서 예전 캐시를 무효화
+RESULT_CACHE_VERSION = 2  # 배정 알고리즘이 바뀌어 같은 시드의 결과가 달라지면 올려서 예전 결과 캐시를 무효화
+RESULT_CACHE_KEEP = 20  # 같은 입력 내용에 대해 남겨 둘 최근 배정 결과 수
+
+def find_input_file(stem):
+    # '연도ST_leader' 같은 이름으로 xlsx → csv → parquet 순서로 찾고, 없으면 xlsx 경로를 돌려줌
+    for ext in INPUT_EXTENSIONS:
+        if os.path.exists(stem + ext): return stem + ext
+    return stem + INPUT_EXTENSIONS[0]
+
+def read_table(path):
+    """확장자에 따라 엑셀/CSV/Parquet 파일을 DataFrame으로 읽습니다. (Parquet은 pyarrow 필요)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        try:
+            return pd.read_csv(path, encoding='utf-8-sig')
+        except UnicodeDecodeError:
+            return pd.read_csv(path, encoding='cp949')  # 한글 엑셀에서 저장한 CSV
+    if ext in ('.parquet', '.pq'):
+        require_module('pyarrow', 'pyarrow')
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+RESULT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+def check_parquet_support(paths, formats=()):
+    # Parquet 입력/출력은 pyarrow가 필요하므로, 읽거나 배정하기 전에 미리 확인해 친절한 오류로 멈춤
+    exts = {os.path.splitext(str(p))[1].lower() for p in paths if p}
+    if 'parquet' in (formats or ()) or exts & {'.parquet', '.pq'}:
+        require_module('pyarrow', 'pyarrow')
+
+def write_xlsx_streaming(path, sheets):
+    """[(시트 이름, DataFrame 또는 행 목록), ...]을 openpyxl 쓰기 전용 모드로 한 행씩 저장합니다.
+    전체 표를 셀 객체로 메모리에 올리지 않으며, DataFrame은 굵은 머리글, 열 너비, 머리글 고정을 붙입니다."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    bold = Font(bold=True)
+    for title, data in sheets:
+        ws = wb.create_sheet(title[:31])
+        if not isinstance(data, pd.DataFrame):
+            for row in data:
+                ws.append(row)
+            continue
+
+        # 열 너비: 머리글/값 중 가장 긴 글자 수 기준 (한글은 두 칸), 최대 50
+        for i, col in enumerate(data.columns, 1):
+            # 빈 값(NaN)은 astype(str) 뒤에도 NaN으로 남을 수 있어, 먼저 빈 문자열로 바꿔 둡니다
+            lengths = data[col].fillna('').astype(str).str.len()
+            longest = max(len(str(col)) * 2, int(lengths.max()) * 1.5 if len(lengths) else 0)
+            ws.column_dimensions[get_column_letter(i)].width = min(longest + 2, 50)
+        ws.freeze_panes = 'A2'
+
+        header = []
+        for col in data.columns:
+            cell = WriteOnlyCell(ws, value=str(col))
+            cell.font = bold
+            header.append(cell)
+        ws.append(header)
+        values = data.astype(object).where(data.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(path)
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+# ------------------------------------------
+# 열 단위(벡터화) 파싱: load_data에서 사용
+# ------------------------------------------
+
+# 주민등록번호 뒷자리 첫 숫자 -> 출생 세기 (1800년대 9/0은 가린 번호와 헷갈리므로 제외)
+RRN_CENTURY = {'1': 1900, '2': 1900, '5': 1900, '6': 1900,
+               '3': 2000, '4': 2000, '7': 2000, '8': 2000}
+
+def parse_birth_years(series):
+    """생년/주민번호 열 전체를 연도(int)로 변환합니다. 반환: (연도 배열, 해석 실패 행 마스크)
+    4자리 연도(2005, 2005.0), 날짜(2005-03-02, 20050302, 05-03-02), 주민번호 앞자리(050302, 50302, 050302-3xxxxxx,
+    0503023xxxxxx)를 인식합니다. 주민번호 뒷자리 첫 숫자가 있으면 그것으로 세기를 정하고, 없으면
+    앞 두 자리 00~30은 2000년대, 나머지는 1900년대로 봅니다. 빈 칸과 해석 실패는 0입니다."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.year.fillna(0).to_numpy(dtype=np.int64), np.zeros(len(series), dtype=bool)
+
+    # 문자열을 (행 × 글자) 유니코드 코드 배열로 펼쳐 글자 단위로 한 번에 판별
+    text = np.char.strip(series.astype(str).fillna('').to_numpy(dtype=str))
+    text = text.astype(f'U{max(text.dtype.itemsize // 4, 14) + 2}')
+    n, width = len(text), text.dtype.itemsize // 4
+    c = text.view(np.uint32).reshape(n, width).astype(np.int64)
+    rows = np.arange(n)
+
+    is_digit = (c >= 48) & (c <= 57)
+    d = np.where(is_digit, c - 48, 0)
+    lead = np.argmin(is_digit, axis=1)  # 앞쪽 연속 숫자 개수 (마지막 두 칸은 항상 빈칸)
+    nxt = c[rows, lead]
+    after = c[rows, np.minimum(lead + 1, width - 1)]
+    zero_tail = np.flip(np.logical_and.accumulate(np.flip((c == 48) | (c == 0), axis=1), axis=1), axis=1)
+    ends = (nxt == 0) | ((nxt == ord('.')) & zero_tail[rows, np.minimum(lead + 1, width - 1)])
+    empty = (c[:, 0] == 0) | np.isin(text, ['nan', 'NaN', 'NaT', 'None', '<NA>'])
+
+    # 4자리 연도 / 날짜 / YYYYMMDD
+    y4 = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    is_year = ((lead == 4) & (ends | np.isin(nxt, [ord('-'), ord('.'), ord('/')]))) | ((lead == 8) & ends)
+
+    # 주민번호 앞자리 (5자리는 엑셀이 앞의 0을 지운 경우) + 뒷자리 첫 숫자
+    yy = np.where(lead == 5, d[:, 0], d[:, 0] * 10 + d[:, 1])
+    is_rrn = (((lead == 5) | (lead == 6)) & (ends | (nxt == ord('-')))) | (lead == 13)
+    gender_digit = np.where(lead == 13, d[:, 6], np.where(is_rrn & (nxt == ord('-')) & (after >= 48) & (after <= 57), after - 48, -1))
+    # 두 자리 연도 날짜 (05-03-02, 05.03.02, 05/03/02)
+    is_short_date = (lead == 2) & np.isin(nxt, [ord('-'), ord('.'), ord('/')]) & is_digit[:, 3] & is_digit[:, 4] & (c[:, 5] == nxt)
+    century = np.select([np.isin(gender_digit, [1, 2, 5, 6]), np.isin(gender_digit, [3, 4, 7, 8]), yy <= 30],
+                        [1900, 2000, 2000], 1900)
+
+    years = np.select([is_year, is_rrn | is_short_date], [y4, century + yy], 0)
+    failed = ~is_year & ~is_rrn & ~is_short_date & ~empty
+    return years.astype(np.int64), failed
+
+def normalize_genders(series):
+    # 고유값마다 한 번만 normalize_gender를 적용한 조회표로 변환
+    s = series.astype(str).fillna('nan')
+    table = {v: normalize_gender(v) for v in s.unique()}
+    return s.map(table)
+
+def get_name_keys(names):
+    # 동명이인 판정용 이름 키: 두 글자 이상이면 성(첫 글자)을 뗀 이름
+    stripped = names.str.strip()
+    return stripped.where(stripped.str.len() <= 1, stripped.str[1:])
+
+def format_phone_numbers(series):
+    # 전화번호 열을 010-1234-5678 형식으로 (엑셀이 지운 맨 앞 0 복원)
+    s = series.astype(str).fillna('').str.strip()
+    empty = (s == '') | (s.str.lower() == 'nan') | series.isna()
+    s = s.str.replace(r'\.0$', '', regex=True).str.replace(r'[-. ]', '', regex=True)
+    s = s.where(~((s.str.len() == 10) & s.str.startswith('1')), '0' + s)
+    s = s.where(s.str.len() != 11, s.str[:3] + '-' + s.str[3:7] + '-' + s.str[7:])
+    return s.mask(empty, '')
+
+def format_genders_output(series):
+    # 고유값마다 한 번만 format_gender_output을 적용한 조회표로 변환
+    table = {v: format_gender_output(v) for v in series.dropna().unique()}
+    return series.map(table).fillna('nan')
+
+def member_keys(df):
+    """참가자 표의 각 행을 '이름|전화번호 숫자' 키로 만듭니다. (이전 결과 파일과 새 명단 대조용)
+    전화번호 열이 없으면 생년/주민번호 열을 쓰고, 같은 키가 여러 번 나오면 '#순번'으로 구분합니다."""
+    name_col = next((c for c in df.columns if '성명' in str(c) or '이름' in str(c)), df.columns[0])
+    id_col = next((c for c in df.columns if '전화' in str(c) or '휴대폰' in str(c)), None)
+    if id_col is None:
+        id_col = next((c for c in df.columns if '생년' in str(c) or '주민' in str(c)), None)
+
+    key = df[name_col].astype(str).fillna('nan').str.strip()
+    if id_col is not None:
+        key = key + '|' + format_phone_numbers(df[id_col]).str.replace(r'\D', '', regex=True)
+    return key + '#' + key.groupby(key).cumcount().astype(str)
+
+# ==========================================
+# 2. 벡터화 점수 엔진 (NumPy)
+# ==========================================
+
+# ------------------------------------------
+# 계측 (단계별 시간 / 하드 조건 탈락 횟수)
+# ------------------------------------------
+
+# 점수를 -inf로 만드는 하드 조건 (ScoreEngine이 검사하는 순서대로)
+HARD_RULES = ('total_cap', 'gender_cap', 'leader_age', 'name_clash', 'new_cam_cap')
+RULE_LABELS = {'total_cap': '조 총원 한도', 'gender_cap': '성별 한도', 'leader_age': '조장 나이',
+               'name_clash': '동명이인', 'new_cam_cap': '신캠조 3명 제한'}
+PASS_COUNT = 4
+
+class Telemetry:
+    """배정 과정 계측 기록. engine.telemetry / TeamBuilder.telemetry에 넣으면 켜지고, None이면 추가 비용이 없습니다.
+    rejections는 (멤버, 조) 평가마다 HARD_RULES 순서로 처음 걸린 하드 조건을 셉니다.
+    passes는 차수별 실행 횟수(=그 차수까지 간 시도 수), 넘겨받은 인원, 남은 인원, 소요 시간입니다."""
+
+    def __init__(self):
+        self.timers = {}  # 단계 이름 -> 누적 초
+        self.rejections = dict.fromkeys(HARD_RULES, 0)
+        self.passes = {p: {'runs': 0, 'members': 0, 'failed': 0, 'seconds': 0.0} for p in range(1, PASS_COUNT + 1)}
+        self.attempts = 0
+        self.feasible = 0
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+
+    def record_pass(self, p, members, failed, seconds):
+        st = self.passes[p]
+        st['runs'] += 1
+        st['members'] += members
+        st['failed'] += failed
+        st['seconds'] += seconds
+
+    def merge(self, other):
+        # 병렬 워커에서 돌려받은 기록 합치기
+        for name, sec in other.timers.items():
+            self.timers[name] = self.timers.get(name, 0.0) + sec
+        for rule, n in other.rejections.items():
+            self.rejections[rule] += n
+        for p, st in other.passes.items():
+            for key, value in st.items():
+                self.passes[p][key] += value
+        self.attempts += other.attempts
+        self.feasible += other.feasible
+
+    def top_rules(self):
+        return sorted((r for r in HARD_RULES if self.rejections[r]), key=lambda r: -self.rejections[r])
+
+    def to_dict(self):
+        return {
+            'timers': dict(self.timers), 'attempts': self.attempts, 'feasible': self.feasible,
+            'passes': {str(p): dict(st) for p, st in self.passes.items()},
+            'rejections': dict(self.rejections), 'top_rules': self.top_rules(),
+        }
+
+def encode_values(values):
+    # 등장 순서대로 정수 코드 부여 (dict 키 비교와 동일한 기준)
+    table = {}
+    codes = np.array([table.setdefault(v, len(table)) for v in values], dtype=np.int64)
+    return codes, table
+
+class ScoreEngine:
+    """한 멤버에 대한 모든 조의 점수(하드 조건 HARD_RULES와 균형 점수)를 한 번에 계산합니다.
+    조별 카운터는 (코드 × 조) 정수 배열로, 점수 항은 같은 모양의 실수 배열로 유지하며
+    하드 조건에 걸린 칸은 -inf로 표시합니다. 내부 조 번호는 0부터 시작합니다.
+    배열은 생성 시 한 번만 할당하고, 시도마다 reset()으로 제자리에서 초기화해 재사용합니다."""
+
+    __slots__ = (
+        'members', 'num_groups', 'weights', 'most_constrained', 'group_ids',
+        # 멤버 코드 (한 번만 인코딩)
+        'gender', 'major', 'birth', 'new_cam', 'name', 'name_dups', 'male_code', 'female_code', 'shape',
+        'birth_values', 'eligible', 'age_term', 'new_cam_bonus',
+        # 시도마다 초기화되는 조 상태
+        'male_limit', 'female_limit', 'total_limit', 'gender_limit',
+        'count', 'genders', 'majors', 'birth_years', 'new_cams', 'name_groups', 'assign',
+        'size_term', 'gender_term', 'major_term', 'birth_term', 'new_cam_term',
+        'telemetry',
+    )
+
+    def __init__(self, members, num_groups, leaders, weights, most_constrained=False):
+        self.members = members
+        self.num_groups = num_groups
+        self.most_constrained = most_constrained
+        self.group_ids = list(range(num_groups))
+
+        # 멤버 정수 코드화 (성별/학과/생년/신캠조/이름 키)
+        self.gender, gender_table = encode_values([m['gender'] for m in members])
+        self.major, major_table = encode_values([m['major'] for m in members])
+        self.birth, birth_table = encode_values([m['birth_year'] for m in members])
+        self.new_cam, new_cam_table = encode_values([m['new_cam'] for m in members])
+        self.name, _ = encode_values([m['name_key'] for m in members])
+
+        self.male_code = gender_table.get('남', -1)
+        self.female_code = gender_table.get('여', -1)
+        self.shape = (len(gender_table), len(major_table), len(birth_table), len(new_cam_table))
+
+        # 조장 나이 가능 조 색인: 조장 최소 생년을 정렬해 두면, 생년 y인 멤버가 갈 수 있는 조는
+        # '최소 생년 <= y'인 앞부분 전체입니다 (조장 생년 0은 제한 없음). 생년 코드별로 한 번만 계산합니다.
+        leader_years = np.array([leaders.get(g, 0) for g in range(1, num_groups + 1)], dtype=np.int64)
+        by_leader_year = np.argsort(leader_years, kind='stable')
+        self.birth_values = np.array(list(birth_table), dtype=np.int64)
+        n_eligible = np.searchsorted(leader_years[by_leader_year], self.birth_values, side='right')
+        self.eligible = np.zeros((len(birth_table), num_groups), dtype=bool)
+        for b, k in enumerate(n_eligible):
+            self.eligible[b, by_leader_year[:k]] = True
+        self.age_term = np.where(self.eligible, 0.0, -np.inf)
+
+        # 같은 이름 키를 가진 인원 수 (많을수록 갈 수 있는 조가 줄어듦)
+        self.name_dups = np.bincount(self.name)[self.name] if len(members) else self.name
+
+        self.set_weights(weights)
+
+        # 조 상태 배열 (한 번만 할당)
+        n_gender, n_major, n_birth, n_new_cam = self.shape
+        self.male_limit = np.zeros(num_groups, dtype=np.int64)
+        self.female_limit = np.zeros(num_groups, dtype=np.int64)
+        self.total_limit = np.zeros(num_groups, dtype=np.int64)
+        self.gender_limit = np.full((n_gender, num_groups), np.iinfo(np.int64).max, dtype=np.int64)
+
+        self.count = np.zeros(num_groups, dtype=np.int64)
+        self.genders = np.zeros((n_gender, num_groups), dtype=np.int64)
+        self.majors = np.zeros((n_major, num_groups), dtype=np.int64)
+        self.birth_years = np.zeros((n_birth, num_groups), dtype=np.int64)
+        self.new_cams = np.zeros((n_new_cam, num_groups), dtype=np.int64)
+        self.name_groups = {}  # 이름 키 코드 -> 그 이름이 있는 조 집합
+        self.assign = np.full(len(members), -1, dtype=np.int64)
+
+        self.size_term = np.zeros(num_groups, dtype=np.float64)
+        self.gender_term = np.zeros((n_gender, num_groups), dtype=np.float64)
+        self.major_term = np.zeros((n_major, num_groups), dtype=np.float64)
+        self.birth_term = np.zeros((n_birth, num_groups), dtype=np.float64)
+        self.new_cam_term = np.zeros((n_new_cam, num_groups), dtype=np.float64)
+
+        self.telemetry = None  # Telemetry를 넣으면 pick마다 하드 조건 탈락 횟수를 셈
+        self.reset(self.male_limit, self.female_limit)
+
+    def set_weights(self, weights):
+        # 인코딩은 그대로 두고 가중치만 교체 (다음 reset부터 반영)
+        self.weights = weights
+        # 신캠조 인원(0, 1, 2, 3+)별 보너스
+        w = weights
+        self.new_cam_bonus = np.array([-w['new_cam_scatter_penalty'], w['new_cam_cluster_bonus'],
+                                       w['new_cam_exist_bonus'], -np.inf], dtype=np.float64)
+
+    def reset(self, male_slots, female_slots):
+        # 새 배열을 만들지 않고 제자리에서 초기화
+        self.male_limit[:] = male_slots
+        self.female_limit[:] = female_slots
+        np.add(self.male_limit, self.female_limit, out=self.total_limit)
+        if self.male_code >= 0: self.gender_limit[self.male_code] = self.male_limit
+        if self.female_code >= 0: self.gender_limit[self.female_code] = self.female_limit
+
+        for arr in (self.count, self.genders, self.majors, self.birth_years, self.new_cams):
+            arr.fill(0)
+        for groups in self.name_groups.values():
+            groups.clear()
+        self.assign.fill(-1)
+
+        self.size_term.fill(0.0)
+        self.size_term[self.total_limit <= 0] = -np.inf
+        self.gender_term.fill(0.0)
+        self.gender_term[self.gender_limit <= 0] = -np.inf
+        self.major_term.fill(0.0)
+        self.birth_term.fill(0.0)
+        self.new_cam_term.fill(self.new_cam_bonus[0])
+
+    def scores(self, i, ignore_age=False):
+        # 점수 = -인원 - 동성 - 동일 학과 - 동일 생년 + 신캠조 보너스
+        b = self.birth[i]
+        score = (self.size_term + self.gender_term[self.gender[i]] + self.major_term[self.major[i]]
+                 + self.birth_term[b] + self.new_cam_term[self.new_cam[i]])
+        if not ignore_age:
+            score += self.age_term[b]
+        clash = self.name_groups.get(self.name[i])
+        if clash: score[list(clash)] = -np.inf
+        return score
+
+    def place(self, i, g):
+        self.assign[i] = g
+        self._update(i, g, 1)
+        self.name_groups.setdefault(self.name[i], set()).add(g)
+
+    def remove(self, i):
+        g = int(self.assign[i])
+        self.assign[i] = -1
+        self._update(i, g, -1)
+        self.name_groups[self.name[i]].discard(g)
+
+    def _update(self, i, g, step):
+        # 카운터를 step만큼 바꾸고 해당 칸의 점수 항을 다시 계산
+        w = self.weights
+        gc, mc, bc, nc = self.gender[i], self.major[i], self.birth[i], self.new_cam[i]
+
+        self.count[g] += step
+        cnt = self.count[g]
+        self.size_term[g] = -np.inf if cnt >= self.total_limit[g] else -(cnt * w['size'])
+
+        self.genders[gc, g] += step
+        cnt = self.genders[gc, g]
+        self.gender_term[gc, g] = -np.inf if cnt >= self.gender_limit[gc, g] else -(cnt * w['gender'])
+
+        self.majors[mc, g] += step
+        self.major_term[mc, g] = -(self.majors[mc, g] * w['major'])
+        self.birth_years[bc, g] += step
+        self.birth_term[bc, g] = -(self.birth_years[bc, g] * w['birth_year'])
+
+        self.new_cams[nc, g] += step
+        self.new_cam_term[nc, g] = self.new_cam_bonus[min(self.new_cams[nc, g], 3)]
+
+    def load(self, assign, male_slots, female_slots):
+        # 저장된 배정 배열로 상태 복원
+        self.reset(male_slots, female_slots)
+        for i, g in enumerate(assign):
+            if g >= 0: self.place(i, int(g))
+
+    def pick(self, i, rng, ignore_age=False):
+        candidates = self.group_ids.copy()
+        rng.shuffle(candidates)
+
+        # 셔플 순서에서 최고점인 첫 번째 조 선택 (기존 '>' 비교와 동일), 없으면 -1
+        if self.telemetry is not None:
+            self._count_rejections(i, ignore_age)
+        scores = self.scores(i, ignore_age)[candidates]
+        k = int(np.argmax(scores))
+        return candidates[k] if scores[k] > -np.inf else -1
+
+    def _count_rejections(self, i, ignore_age):
+        # 조마다 HARD_RULES 순서로 처음 걸리는 하드 조건 하나만 셈
+        clash = np.zeros(self.num_groups, dtype=bool)
+        clash[list(self.name_groups.get(self.name[i], ()))] = True
+        no_age = np.zeros(self.num_groups, dtype=bool) if ignore_age else ~self.eligible[self.birth[i]]
+        masks = (self.size_term == -np.inf, self.gender_term[self.gender[i]] == -np.inf, no_age, clash,
+                 self.new_cam_term[self.new_cam[i]] == -np.inf)
+
+        rejections = self.telemetry.rejections
+        seen = np.zeros(self.num_groups, dtype=bool)
+        for rule, mask in zip(HARD_RULES, masks):
+            hit = mask & ~seen
+            rejections[rule] += int(hit.sum())
+            seen |= hit
+
+    def try_assign(self, order, rng, ignore_age=False):
+        if self.most_constrained:
+            return self._try_assign_constrained(order, rng, ignore_age)
+
+        failed = []
+        for i in order:
+            g = self.pick(i, rng, ignore_age)
+            if g >= 0:
+                self.place(i, g)
+            else:
+                failed.append(i)
+        return failed
+
+    def option_counts(self, ignore_age=False):
+        # (성별 코드 × 생년 코드)별로 아직 자리가 남아 있고 나이 조건도 맞는 조의 수
+        open_groups = (self.gender_term > -np.inf) & (self.size_term > -np.inf)
+        if ignore_age:
+            return np.repeat(open_groups.sum(axis=1, keepdims=True), len(self.birth_values), axis=1)
+        return open_groups.astype(np.int64) @ self.eligible.T.astype(np.int64)
+
+    def _try_assign_constrained(self, order, rng, ignore_age=False):
+        # 같은 (성별, 생년) 멤버는 갈 수 있는 조가 같으므로 묶어서 관리하고,
+        # 남은 선택지가 가장 적은 묶음부터 배정합니다. 어떤 조의 자리가 닫힐 때만 선택지를 다시 셉니다.
+        queues = {}
+        for i in sorted(order, key=lambda i: -self.name_dups[i]):
+            queues.setdefault((self.gender[i], self.birth[i]), deque()).append(i)
+
+        failed = []
+        current = None
+        while queues:
+            if current is None:
+                counts = self.option_counts(ignore_age)
+                current = min(queues, key=lambda k: (counts[k], self.birth_values[k[1]]))
+            queue = queues[current]
+            i = queue.popleft()
+            if not queue:
+                del queues[current]
+                current = None
+
+            g = self.pick(i, rng, ignore_age)
+            if g < 0:
+                failed.append(i)
+                continue
+            self.place(i, g)
+            if self.size_term[g] == -np.inf or self.gender_term[self.gender[i], g] == -np.inf:
+                current = None
+        return failed
+
+    def total_score(self):
+        # 전체 균형 점수 (높을수록 좋음): 최종 카운터 기준으로 배정 점수를 모두 합한 값
+        return self.score_counts(self.count, self.genders, self.majors, self.birth_years, self.new_cams)
+
+    def score_counts(self, count, genders, majors, birth_years, new_cams):
+        # 인원이 k명인 칸은 0+1+...+(k-1) = k(k-1)/2 만큼 감점되므로 배정 순서와 무관합니다.
+        w = self.weights
+        pairs = lambda a: int((a * (a - 1) // 2).sum())
+        new_cam_total = np.cumsum(np.concatenate(([0.0], self.new_cam_bonus[:3])))
+        return (-pairs(count) * w['size'] - pairs(genders) * w['gender']
+                - pairs(majors) * w['major'] - pairs(birth_years) * w['birth_year']
+                + float(new_cam_total[np.minimum(new_cams, 3)].sum()))
+
+    def assignments(self, assign=None):
+        assign = self.assign if assign is None else assign
+        return {m['original_idx']: (int(g) + 1 if g >= 0 else None) for m, g in zip(self.members, assign)}
+
+def pair_slots(male_slots, female_slots):
+    """남/여 슬롯을 조별 총원 편차가 1 이내가 되도록 짝지어 (남, 여) 목록으로 돌려줍니다.
+    큰 남자 슬롯과 작은 여자 슬롯을 맞물리는 짝이 총원 범위를 가장 좁히므로,
+    이 짝으로도 편차가 1을 넘으면 가능한 짝이 없는 것이며 None을 돌려줍니다."""
+    pairs = list(zip(sorted(male_slots, reverse=True), sorted(female_slots)))
+    totals = [m + f for m, f in pairs]
+    if max(totals) - min(totals) > 1:
+        return None
+    return pairs
+
+def run_attempt(engine, slot_pairs, order, rng):
+    """(남, 여) 슬롯 짝을 조에 무작위로 나눠준 뒤 1~4차 배정을 수행합니다. 성공하면 True이며 결과는 engine에 남습니다."""
+    pairs = list(slot_pairs)
+    rng.shuffle(pairs)
+    male_slots = [m for m, _ in pairs]
+    female_slots = [f for _, f in pairs]
+
+    engine.reset(male_slots, female_slots)
+    return run_passes(engine, order, rng)
+
+def run_passes(engine, order, rng):
+    """현재 engine 상태에 order의 멤버를 1~4차로 배정합니다. 모두 배정되면 True."""
+    tel = engine.telemetry
+
+    # 1~2차는 조장 나이 조건 지킴, 3차부터(최후의 수단) 나이 조건 완화. 남은 인원이 없으면 중단
+    unassigned = order
+    for p, ignore_age in enumerate((False, False, True, True), 1):
+        if p > 1 and not unassigned: break
+        start = time.perf_counter() if tel else 0.0
+        failed = engine.try_assign(unassigned, rng, ignore_age=ignore_age)
+        if tel: tel.record_pass(p, len(unassigned), len(failed), time.perf_counter() - start)
+        unassigned = failed
+
+    if tel:
+        tel.attempts += 1
+        tel.feasible += not unassigned
+    return not unassigned
+
+# ------------------------------------------
+# 균형 지표 (배정 비교용)
+# ------------------------------------------
+
+METRIC_LABELS = {
+    'size_spread': '총원 편차', 'male_spread': '남자 편차', 'female_spread': '여자 편차',
+    'gender_ratio_dev': '성비 편차 (남자 비율)', 'major_entropy_min': '학과 다양성 (엔트로피 최소)',
+    'major_entropy_mean': '학과 다양성 (엔트로피 평균)', 'birth_var_mean': '조 내 생년 분산 (평균)',
+    'birth_mean_spread': '조별 평균 생년 편차', 'new_cam_singletons': '신캠조 1명 배정',
+    'new_cam_clusters': '신캠조 2명 이상 묶음', 'new_cam_over_cap': '신캠조 4명 이상 (위반)',
+    'age_violations': '조장 나이 위반', 'name_clashes': '동명이인 (위반)', 'unplaced': '미배정', 'score': '균형 점수',
+}
+
+def evaluate_assignment(engine, assign=None, per_group=False):
+    """배정의 조별/전체 균형 지표를 계산합니다. assign(멤버별 내부 조 번호, 미배정 -1)을 주면 bincount 한 번씩으로
+    카운터를 새로 만들고, 없으면 engine이 유지하는 카운터를 그대로 써서 탐색 중에도 부담 없이 부를 수 있습니다.
+    전체 지표: 총원/남/여 편차(최대-최소), 성비 편차(전체 남자 비율과의 최대 차이), 학과 엔트로피(비트, 조별 최소/평균),
+    생년 분산(조별 평균)과 조별 평균 생년 편차, 신캠조 1명/2명 이상 묶음 수, 조장 나이 위반, 동명이인, 균형 점수.
+    per_group=True면 조별 값 목록('groups')도 함께 돌려줍니다."""
+    G = engine.num_groups
+    live = assign is None
+    assign = engine.assign if live else np.asarray(assign, dtype=np.int64)  # 동명이인은 둘 다 배정 배열로 셈
+    placed = assign >= 0
+    g = assign[placed]
+    n_gender, n_major, n_birth, n_new_cam = engine.shape
+
+    if live:
+        sizes, genders, majors = engine.count, engine.genders, engine.majors
+        birth_years, new_cams = engine.birth_years, engine.new_cams
+    else:
+        def counts(codes, n):
+            return np.bincount(codes[placed] * G + g, minlength=n * G).reshape(n, G)
+        sizes = np.bincount(g, minlength=G)
+        genders, majors = counts(engine.gender, n_gender), counts(engine.major, n_major)
+        birth_years, new_cams = counts(engine.birth, n_birth), counts(engine.new_cam, n_new_cam)
+
+    zeros = np.zeros(G, dtype=np.int64)
+    male = genders[engine.male_code] if engine.male_code >= 0 else zeros
+    female = genders[engine.female_code] if engine.female_code >= 0 else zeros
+    safe = np.maximum(sizes, 1)
+
+    total_placed = max(int(sizes.sum()), 1)
+    male_ratio = male / safe
+    ratio_dev = male_ratio - male.sum() / total_placed
+
+    p = majors / safe
+    entropy = (p * np.log2(1.0 / np.where(p > 0, p, 1.0))).sum(axis=0)
+
+    # 생년 0(해석 실패)은 분산에서 제외
+    known = (engine.birth_values > 0)[:, None]
+    ref = float(engine.birth_values.max()) if len(engine.birth_values) else 0.0  # 큰 연도값의 제곱 오차 방지
+    years = engine.birth_values[:, None] - ref
+    by = np.where(known, birth_years, 0)
+    n_known = np.maximum(by.sum(axis=0), 1)
+    offset = (by * years).sum(axis=0) / n_known
+    birth_var = (by * years ** 2).sum(axis=0) / n_known - offset ** 2
+    birth_mean = offset + ref
+
+    singletons = (new_cams == 1).sum(axis=0)
+    clusters = (new_cams >= 2).sum(axis=0)
+    age_violations = (birth_years * ~engine.eligible).sum(axis=0)
+
+    pairs = engine.name[placed] * G + g
+    name_clashes = len(pairs) - len(np.unique(pairs))
+
+    spread = lambda a: int(a.max() - a.min()) if G else 0
+    result = {
+        'size_spread': spread(sizes), 'male_spread': spread(male), 'female_spread': spread(female),
+        'gender_ratio_dev': float(np.abs(ratio_dev).max()) if G else 0.0,
+        'major_entropy_min': float(entropy.min()) if G else 0.0,
+        'major_entropy_mean': float(entropy.mean()) if G else 0.0,
+        'birth_var_mean': float(birth_var.mean()) if G else 0.0,
+        'birth_mean_spread': float(birth_mean.max() - birth_mean.min()) if G else 0.0,
+        'new_cam_singletons': int(singletons.sum()), 'new_cam_clusters': int(clusters.sum()),
+        'new_cam_over_cap': int((new_cams > 3).sum()),
+        'age_violations': int(age_violations.sum()), 'name_clashes': int(name_clashes),
+        'unplaced': int((~placed).sum()),
+        'score': engine.score_counts(sizes, genders, majors, birth_years, new_cams),
+    }
+
+    if per_group:
+        result['groups'] = [
+            {'group': k + 1, 'size': int(sizes[k]), 'male': int(male[k]), 'female': int(female[k]),
+             'male_ratio_dev': float(ratio_dev[k]), 'major_entropy': float(entropy[k]),
+             'birth_mean': float(birth_mean[k]), 'birth_var': float(birth_var[k]),
+             'new_cam_singletons': int(singletons[k]), 'new_cam_clusters': int(clusters[k]),
+             'age_violations': int(age_violations[k])}
+            for k in range(G)
+        ]
+    return result
+
+# ==========================================
+# 3. 멀티 프로세스 재시작 탐색
+# ==========================================
+
+# 워커 프로세스마다 한 번만 받아두는 엔진/슬롯 정보
+_worker_state = {}
+
+def _init_search_worker(engine, slot_pairs, order, stop=None):
+    _worker_state.update(engine=engine, slot_pairs=slot_pairs, order=order, stop=stop)
+
+def _init_anytime_worker(engine, slot_pairs, order, stop):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C는 부모가 받아 stop으로 알림
+    _init_search_worker(engine, slot_pairs, order, stop)
+
+def _search_chunk(base_seed, attempts, deadline=None):
+    # 시도마다 (base_seed + 시도 번호)로 독립 시드 → 워커 수와 무관하게 같은 결과
+    # deadline(time.time() 기준)이 지나거나 stop이 켜지면 남은 시도는 건너뜀
+    st = _worker_state
+    engine = st['engine']
+    stop = st.get('stop')
+    if engine.telemetry is not None:
+        engine.telemetry = Telemetry()  # 덩어리마다 새로 세어 돌려주고 부모에서 합침
+    done, feasible, best = 0, 0, None
+    for attempt in attempts:
+        if deadline is not None and (time.time() >= deadline or (stop is not None and stop.is_set())):
+            break
+        done += 1
+        rng = random.Random(base_seed + attempt)
+        if run_attempt(engine, st['slot_pairs'], st['order'], rng):
+            feasible += 1
+            score = engine.total_score()
+            if best is None or score > best[0]:
+                best = (score, attempt, engine.assign.copy(), engine.male_limit.copy(), engine.female_limit.copy())
+    return done, feasible, best, engine.telemetry
+
+def _better(cand, best):
+    # 점수가 높은 쪽, 동점이면 앞선 시도 번호 우선
+    return cand is not None and (best is None or (cand[0], -cand[1]) > (best[0], -best[1]))
+
+def parallel_search(engine, slot_pairs, order, max_retries, workers, base_seed, on_progress=None):
+    """max_retries번의 독립 시도를 프로세스 풀에 나눠 실행하고,
+    가능한 배정 중 전체 균형 점수가 가장 높은 것을 돌려줍니다.
+    반환: (가능한 배정 수, (점수, 시도 번호, 배정 배열, 남자 슬롯, 여자 슬롯) 또는 None)"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk = max(1, max_retries // (workers * 8))
+    chunks = [range(s, min(s + chunk, max_retries + 1)) for s in range(1, max_retries + 1, chunk)]
+
+    feasible, best = 0, None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                             initargs=(engine, slot_pairs, order)) as pool:
+        for done, (_, n_ok, cand, tel) in enumerate(pool.map(_search_chunk, [base_seed] * len(chunks), chunks), 1):
+            feasible += n_ok
+            if tel is not None: engine.telemetry.merge(tel)
+            if _better(cand, best):
+                best = cand
+            if on_progress: on_progress(done * chunk, feasible)
+    return feasible, best
+
+def anytime_search(engine, slot_pairs, order, time_budget, workers, base_seed, on_progress=None):
+    """time_budget초 동안 독립 시도를 계속 돌리며 전체 균형 점수가 가장 높은 배정을 유지합니다.
+    시도 횟수 대신 시간으로 멈추므로 인원이 적으면 여러 배정 중 고르고, 어려운 입력도 제시간에 끝납니다.
+    Ctrl-C를 누르면 진행 중인 시도만 마치고 그때까지의 최고 배정을 돌려줍니다. (한 번 더 누르면 강제 종료)
+    반환: (시도 수, 가능한 배정 수, (점수, 시도 번호, 배정 배열, 남자 슬롯, 여자 슬롯) 또는 None, 중단 여부)"""
+    deadline = time.time() + time_budget
+    chunk = 16
+    parent_tel = engine.telemetry
+    attempts = feasible = 0
+    best = None
+    next_start = 1
+
+    if workers > 1:
+        import multiprocessing
+        stop = multiprocessing.Event()
+    else:
+        stop = threading.Event()
+
+    def on_sigint(signum, frame):
+        stop.set()
+        signal.signal(signal.SIGINT, previous)
+
+    previous = None
+    if threading.current_thread() is threading.main_thread():
+        previous = signal.signal(signal.SIGINT, on_sigint)
+
+    def absorb(result):
+        nonlocal attempts, feasible, best
+        n_done, n_ok, cand, tel = result
+        attempts += n_done
+        feasible += n_ok
+        if tel is not None: parent_tel.merge(tel)
+        if _better(cand, best): best = cand
+        if on_progress: on_progress(attempts, feasible, best[0] if best else None)
+
+    def running():
+        return time.time() < deadline and not stop.is_set()
+
+    try:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_anytime_worker,
+                                     initargs=(engine, slot_pairs, order, stop)) as pool:
+                pending = set()
+                while True:
+                    while running() and len(pending) < workers * 2:
+                        pending.add(pool.submit(_search_chunk, base_seed, range(next_start, next_start + chunk), deadline))
+                        next_start += chunk
+                    if not pending: break
+                    finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        absorb(fut.result())
+        else:
+            _init_search_worker(engine, slot_pairs, order, stop)
+            while running():
+                absorb(_search_chunk(base_seed, range(next_start, next_start + chunk), deadline))
+                next_start += chunk
+    finally:
+        _worker_state.clear()
+        engine.telemetry = parent_tel
+        if previous is not None and signal.getsignal(signal.SIGINT) is on_sigint:
+            signal.signal(signal.SIGINT, previous)
+
+    return attempts, feasible, best, stop.is_set()
+
+# ------------------------------------------
+# 분할 배정 (조 묶음별 병렬 + 합친 뒤 보정)
+# ------------------------------------------
+
+def split_groups(leaders, num_groups, shards):
+    """조를 shards개 묶음으로 나눕니다. 조장 생년 순으로 돌려가며 나눠 묶음마다 조장 나이 분포가 비슷합니다.
+    반환: 묶음별 내부 조 번호 목록"""
+    by_year = sorted(range(num_groups), key=lambda g: (leaders.get(g + 1, 0), g))
+    return [sorted(by_year[k::shards]) for k in range(shards) if by_year[k::shards]]
+
+def deal_members(engine, blocks, male_slots, female_slots):
+    """성별마다 멤버를 (신캠조, 생년) 순으로 늘어놓고 앞 묶음부터 자리 수만큼 채웁니다. 같은 신캠조는 되도록
+    한 묶음에 모입니다. 같은 이름 키가 묶음의 조 수를 넘거나 한 신캠조가 묶음 조 수의 2배(넘치면 3배)를 넘게 되는
+    멤버는 조건을 지키는 묶음 중 자리가 가장 많이 남은 곳으로 보냅니다.
+    묶음마다 성별 인원은 자리 수와 정확히 같습니다. 반환: 묶음별 멤버 번호 목록"""
+    dealt = [[] for _ in blocks]
+    sizes = [len(block) for block in blocks]
+    names = [{} for _ in blocks]
+    new_cams = [{} for _ in blocks]
+    for code, slots in ((engine.male_code, male_slots), (engine.female_code, female_slots)):
+        idx = np.flatnonzero(engine.gender == code)
+        idx = idx[np.lexsort((engine.birth_values[engine.birth[idx]], engine.new_cam[idx]))]
+        quota = [int(sum(slots[g] for g in block)) for block in blocks]
+        fits = lambda b, nm, nc, per_group=2: (quota[b] > 0 and names[b].get(nm, 0) < sizes[b]
+                                               and new_cams[b].get(nc, 0) < per_group * sizes[b])
+
+        b = 0
+        for i in idx.tolist():
+            while b < len(blocks) and quota[b] == 0:
+                b += 1
+            nm, nc = engine.name[i], engine.new_cam[i]
+            target = b if b < len(blocks) and fits(b, nm, nc) else None
+            if target is None:
+                spare = sorted(range(len(blocks)), key=lambda k: -quota[k])
+                target = next((k for per_group in (2, 3) for k in spare if fits(k, nm, nc, per_group)), spare[0])
+            dealt[target].append(i)
+            quota[target] -= 1
+            names[target][nm] = names[target].get(nm, 0) + 1
+            new_cams[target][nc] = new_cams[target].get(nc, 0) + 1
+    return dealt
+
+def _solve_shard(task):
+    # 묶음 하나를 독립 문제로 배정 (ScoreEngine을 묶음 멤버/조로 새로 만듦)
+    # 반환: (시도 횟수, 묶음 배정 배열, 남자 슬롯, 여자 슬롯). 모두 실패하면 미배정이 가장 적었던 시도의 배정
+    members, leaders, slot_pairs, weights, seed, max_retries, most_constrained = task
+    engine = ScoreEngine(members, len(slot_pairs), leaders, weights, most_constrained)
+    order = sorted(range(len(members)), key=lambda i: members[i]['birth_year'])
+    rng = random.Random(seed)
+    best, best_left = None, None
+    for attempt in range(1, max_retries + 1):
+        ok = run_attempt(engine, slot_pairs, order, rng)
+        left = int((engine.assign < 0).sum())
+        if best_left is None or left < best_left:
+            best, best_left = (engine.assign.copy(), engine.male_limit.copy(), engine.female_limit.copy()), left
+        if ok: break
+    return (attempt,) + best
+
+def shard_assign(engine, leaders, slot_pairs, shards, workers, base_seed, max_retries, rng, on_progress=None):
+    """조를 shards개 묶음으로 나눠 묶음마다 (workers > 1이면 병렬로) 배정하고, 못 넣은 멤버는 합친 뒤 전체 조에서 채웁니다.
+    반환: (묶음 시도 횟수 합, 보정으로 배정한 인원 또는 None(실패)). 결과는 engine에 남습니다."""
+    G = engine.num_groups
+    pairs = list(slot_pairs)
+    rng.shuffle(pairs)
+    male_slots = np.array([m for m, _ in pairs], dtype=np.int64)
+    female_slots = np.array([f for _, f in pairs], dtype=np.int64)
+
+    # 하드 조건은 모두 조 안의 조건이라 묶음끼리 얽히지 않으므로 묶음마다 따로 풀어도 됨
+    blocks = split_groups(leaders, G, shards)
+    dealt = deal_members(engine, blocks, male_slots, female_slots)
+    tasks = [([engine.members[i] for i in idx], {k + 1: leaders.get(g + 1, 0) for k, g in enumerate(block)},
+              [(int(male_slots[g]), int(female_slots[g])) for g in block], engine.weights, base_seed + b,
+              max_retries, engine.most_constrained)
+             for b, (block, idx) in enumerate(zip(blocks, dealt))]
+
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_solve_shard, tasks))
+    else:
+        results = []
+        for done, task in enumerate(tasks, 1):
+            results.append(_solve_shard(task))
+            if on_progress: on_progress(done, len(tasks))
+
+    # 묶음 결과 합치기 (묶음 안에서 다시 섞인 슬롯 반영)
+    for block, (_, _, block_male, block_female) in zip(blocks, results):
+        male_slots[block], female_slots[block] = block_male, block_female
+    engine.reset(male_slots, female_slots)
+    leftover = []
+    for block, idx, (_, assign, _, _) in zip(blocks, dealt, results):
+        for i, g in zip(idx, assign.tolist()):
+            if g >= 0: engine.place(i, block[g])
+            else: leftover.append(i)
+
+    # 묶음 안에서 못 넣은 멤버 + 어느 묶음에도 못 간 멤버(남/여 외 성별)를 전체 조로 보정
+    dealt_any = set(itertools.chain.from_iterable(dealt))
+    leftover.extend(i for i in range(len(engine.members)) if i not in dealt_any)
+    tries = sum(r[0] for r in results)
+    if leftover and not run_passes(engine, sorted(leftover, key=lambda i: engine.members[i]['birth_year']), rng):
+        # 남은 자리가 있는 조에 못 들어가면 다른 묶음의 같은 성별 멤버와 자리를 나눔
+        blocked = (~engine.eligible).astype(np.int64)
+        for i in leftover:
+            if engine.assign[i] >= 0: continue
+            gc = engine.gender[i]
+            free = np.flatnonzero((engine.count < engine.total_limit) & (engine.genders[gc] < engine.gender_limit[gc]))
+            if swap_into(engine, i, free, blocked) < 0:
+                return tries, None
+    return tries, len(leftover)
+
+# ------------------------------------------
+# 가중치 탐색 (여러 가중치 조합 비교)
+# ------------------------------------------
+
+# 파레토 비교에 쓰는 지표와 방향 (1: 작을수록 좋음, -1: 클수록 좋음)
+SWEEP_OBJECTIVES = (('gender_ratio_dev', 1), ('major_entropy_min', -1), ('birth_mean_spread', 1),
+                    ('new_cam_singletons', 1), ('age_violations', 1))
+
+def weight_grid(base, grid):
+    """grid({항목: [값, ...]})의 모든 조합으로 base를 바꾼 가중치 목록"""
+    keys = list(grid)
+    return [dict(base, **dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys))]
+
+def weight_samples(base, ranges, count, rng):
+    """ranges({항목: (최소, 최대)}) 안에서 균등하게 뽑은 가중치 count개"""
+    return [dict(base, **{k: round(rng.uniform(lo, hi), 1) for k, (lo, hi) in ranges.items()}) for _ in range(count)]
+
+def _sweep_config(base_seed, weights, attempts):
+    # 워커의 엔진(한 번 인코딩된 명단)에 가중치만 바꿔 끼우고 attempts번 시도 중 최고 배정을 평가
+    engine = _worker_state['engine']
+    engine.set_weights(weights)
+    start = time.perf_counter()
+    _, feasible, best, _ = _search_chunk(base_seed, range(1, attempts + 1))
+    seconds = time.perf_counter() - start
+    metrics = None
+    if best is not None:
+        engine.load(best[2], best[3], best[4])
+        metrics = evaluate_assignment(engine)
+    return {'weights': weights, 'feasible': feasible, 'attempts': attempts, 'seconds': seconds, 'metrics': metrics}
+
+def pareto_front(results):
+    """SWEEP_OBJECTIVES 기준으로 다른 결과에 모두 지지 않는(지배당하지 않는) 결과의 번호 목록"""
+    ok = [i for i, r in enumerate(results) if r['metrics'] is not None]
+    if not ok:
+        return []
+    P = np.array([[sign * results[i]['metrics'][key] for key, sign in SWEEP_OBJECTIVES] for i in ok])
+    # dominated[i, j]: j가 i보다 모든 지표에서 같거나 좋고 하나 이상 더 좋음
+    dominated = ((P[None, :, :] <= P[:, None, :]).all(axis=2) & (P[None, :, :] < P[:, None, :]).any(axis=2)).any(axis=1)
+    return [i for i, d in zip(ok, dominated) if not d]
+
+def sweep_weights(engine, slot_pairs, order, configs, attempts, workers, base_seed, on_progress=None):
+    """가중치 조합마다 같은 시드(base_seed + 시도 번호)로 attempts번 시도해 최고 배정의 균형 지표를 구합니다.
+    명단 인코딩은 engine 하나를 워커에 한 번만 넘겨 공유하며, 조합끼리 같은 난수열을 쓰므로 차이는 가중치에서만 옵니다.
+    반환: 조합별 {'weights', 'feasible', 'attempts', 'seconds', 'metrics'} 목록 (조합 순서 그대로)"""
+    results = []
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                 initargs=(engine, slot_pairs, order)) as pool:
+            for r in pool.map(_sweep_config, [base_seed] * len(configs), configs, [attempts] * len(configs)):
+                results.append(r)
+                if on_progress: on_progress(len(results))
+    else:
+        _init_search_worker(engine, slot_pairs, order)
+        try:
+            for weights in configs:
+                results.append(_sweep_config(base_seed, weights, attempts))
+                if on_progress: on_progress(len(results))
+        finally:
+            _worker_state.clear()
+    return results
+
+# ==========================================
+# 4. 국소 탐색 (교환 / 담금질)
+# ==========================================
+
+def refine_assignment(engine, rng, iterations=0, time_limit=0.0, start_temp=None):
+    """그리디 배정이 끝난 engine에서 같은 성별 멤버 두 명의 조를 맞바꾸며 전체 균형 점수를 높입니다.
+    같은 성별끼리만 바꾸므로 성별/총원 한도는 그대로이며, 동명이인·신캠조 3명 제한을 어기거나
+    둘 중 누구라도 조장 나이 조건이 맞지 않는 조로 보내는 교환은 받지 않습니다. iterations(횟수)와 time_limit(초) 중 먼저 닿는 쪽에서 멈춥니다."""
+    if not iterations and not time_limit:
+        return None
+
+    w = engine.weights
+    temp0 = w['birth_year'] if start_temp is None else start_temp
+    new_cam_total = np.cumsum(np.concatenate(([0.0], engine.new_cam_bonus[:3]))).tolist()
+
+    assign, name_groups = engine.assign, engine.name_groups
+    blocked = (engine.age_term < 0).tolist()
+    majors, birth_years, new_cams = engine.majors, engine.birth_years, engine.new_cams
+    members = [i for i in range(len(assign)) if assign[i] >= 0]
+    pools = {}
+    for i in members:
+        pools.setdefault(engine.gender[i], []).append(i)
+
+    score = start = engine.total_score()
+    best_score, best_assign = score, assign.copy()
+    accepted = it = 0
+    t0 = time.perf_counter()
+
+    while members:
+        if iterations and it >= iterations: break
+        elapsed = time.perf_counter() - t0
+        if time_limit and elapsed >= time_limit: break
+        it += 1
+
+        progress = max(it / iterations if iterations else 0.0, elapsed / time_limit if time_limit else 0.0)
+        temp = temp0 * (1.0 - progress)
+
+        i = members[rng.randrange(len(members))]
+        pool = pools[engine.gender[i]]
+        j = pool[rng.randrange(len(pool))]
+        A, B = assign[i], assign[j]
+        if A == B or engine.name[i] == engine.name[j]: continue
+
+        # 하드 조건: 동명이인 / 신캠조 3명 / 나이 조건이 안 맞는 조로 보내기 금지
+        # (위반 총수만 비교하면 원래 맞는 조에 있던 사람에게 위반을 떠넘길 수 있음)
+        if B in name_groups[engine.name[i]] or A in name_groups[engine.name[j]]: continue
+        ci, cj = engine.new_cam[i], engine.new_cam[j]
+        if ci != cj and (new_cams[ci, B] >= 3 or new_cams[cj, A] >= 3): continue
+        bi, bj = engine.birth[i], engine.birth[j]
+        if blocked[bi][B] or blocked[bj][A]: continue
+
+        # 점수 변화량 (인원이 k명인 칸의 감점은 w·k(k-1)/2)
+        delta = 0.0
+        for counts, weight, a, b in ((majors, w['major'], engine.major[i], engine.major[j]),
+                                     (birth_years, w['birth_year'], bi, bj)):
+            if a != b:
+                delta += weight * ((counts[a, A] - 1) - counts[b, A] + (counts[b, B] - 1) - counts[a, B])
+        if ci != cj:
+            for c, g, step in ((ci, A, -1), (cj, A, 1), (cj, B, -1), (ci, B, 1)):
+                k = new_cams[c, g]
+                delta += new_cam_total[k + step] - new_cam_total[k]
+
+        if delta < 0 and (temp <= 0 or rng.random() >= math.exp(delta / temp)):
+            continue
+
+        engine.remove(i)
+        engine.remove(j)
+        engine.place(i, int(B))
+        engine.place(j, int(A))
+        score += delta
+        accepted += 1
+        if score > best_score:
+            best_score = score
+            best_assign = assign.copy()
+
+    if score < best_score:
+        engine.load(best_assign, engine.male_limit, engine.female_limit)
+
+    return {'start': start, 'end': engine.total_score(), 'iterations': it, 'accepted': accepted,
+            'seconds': time.perf_counter() - t0}
+
+def swap_into(engine, i, targets, blocked):
+    """멤버 i가 targets 조의 빈자리에 동명이인/신캠조 제한으로 못 들어갈 때, 같은 성별 멤버 j(조 h)를 빈자리로
+    보내고 i를 h에 넣습니다. 성별/총원 한도는 그대로이고, blocked(생년 × 조, 나이 위반 1)로 센 위반은 늘리지 않습니다.
+    반환: j가 들어간 조 번호, 못 찾으면 -1"""
+    bi = engine.birth[i]
+    same_gender = np.flatnonzero((engine.gender == engine.gender[i]) & (engine.assign >= 0))
+    for g in targets:
+        g = int(g)
+        for j in same_gender:
+            h = int(engine.assign[j])
+            bj = engine.birth[j]
+            if h == g or blocked[bi, h] + blocked[bj, g] > blocked[bi, g] + blocked[bj, h]:
+                continue
+            if g in engine.name_groups[engine.name[j]] or engine.new_cams[engine.new_cam[j], g] >= 3:
+                continue
+            engine.remove(j)
+            if engine.scores(i, ignore_age=True)[h] > -np.inf:
+                engine.place(i, h)
+                if engine.scores(j, ignore_age=True)[g] > -np.inf:
+                    engine.place(j, g)
+                    return g
+                engine.remove(i)
+            engine.place(j, h)
+    return -1
+
+# ------------------------------------------
+# 증분 배정 (이전 결과 유지 + 추가/취소 반영)
+# ------------------------------------------
+
+INCREMENTAL_PLAIN_TRIES = 20
+
+def fit_slots_to_groups(slot_pairs, kept_male, kept_female):
+    """(남, 여) 슬롯 짝을 조에 나눠줍니다. 남아 있는 인원이 슬롯을 넘는 만큼(옮겨야 하는 인원)의 합이 가장 작도록,
+    짝 종류 × 조의 (남, 여) 유지 인원 종류 사이의 작은 수송 문제를 최소 비용 흐름으로 풉니다.
+    같은 종류의 조끼리는 어느 짝을 받아도 같으므로 종류 수만 작으면 조가 많아도 금방 풀립니다.
+    반환: (조별 남자 슬롯, 조별 여자 슬롯)"""
+    pair_types = sorted(set(slot_pairs), reverse=True)
+    groups_by_type = {}
+    for g, key in enumerate(zip(map(int, kept_male), map(int, kept_female))):
+        groups_by_type.setdefault(key, []).append(g)
+    kept_types = sorted(groups_by_type, reverse=True)
+
+    P, K = len(pair_types), len(kept_types)
+    S, T = 0, 1
+    mcf = MinCostFlow(2 + P + K)
+    edges = {}
+    for p, (m, f) in enumerate(pair_types):
+        mcf.add_edge(S, 2 + p, slot_pairs.count((m, f)))
+        for k, (km, kf) in enumerate(kept_types):
+            edges[p, k] = mcf.add_edge(2 + p, 2 + P + k, len(slot_pairs), max(0, km - m) + max(0, kf - f))
+    for k, key in enumerate(kept_types):
+        mcf.add_edge(2 + P + k, T, len(groups_by_type[key]))
+    mcf.solve(S, T, len(slot_pairs))
+
+    male_slots, female_slots = [0] * len(kept_male), [0] * len(kept_male)
+    for (p, k), e in edges.items():
+        groups = groups_by_type[kept_types[k]]
+        for _ in range(mcf.flow[e]):
+            g = groups.pop()
+            male_slots[g], female_slots[g] = pair_types[p]
+    return male_slots, female_slots
+
+def incremental_assign(engine, kept, slot_pairs, rng, max_retries=2000):
+    """kept(멤버 번호 -> 내부 조 번호)는 두고 나머지 멤버만 배정하며, 성별 한도를 넘은 조에서만 꼭 필요한 인원을 옮깁니다.
+    반환: (성공한 시도 번호 또는 None, 원래 조에서 옮겨진 kept 멤버 번호 목록). 결과는 engine에 남습니다."""
+    n = len(engine.members)
+    base = np.full(n, -1, dtype=np.int64)
+    for i, g in kept.items():
+        base[i] = g
+
+    kept_male = np.bincount(base[(base >= 0) & (engine.gender == engine.male_code)], minlength=engine.num_groups)
+    kept_female = np.bincount(base[(base >= 0) & (engine.gender == engine.female_code)], minlength=engine.num_groups)
+    male_slots, female_slots = fit_slots_to_groups(slot_pairs, kept_male, kept_female)
+    engine.load(base, male_slots, female_slots)
+
+    def destination_rank(i):
+        # 0: 나이 조건까지 맞는 빈자리 있음, 1: 나이만 어기는 빈자리, 2: 갈 곳 없음
+        for rank, ignore_age in enumerate((False, True)):
+            if (engine.scores(i, ignore_age=ignore_age) > -np.inf).any():
+                return rank
+        return 2
+
+    # 한도를 넘은 조에서 넘은 만큼만 빼기
+    for g in range(engine.num_groups):
+        for code in (engine.male_code, engine.female_code):
+            if code < 0: continue
+            excess = int(engine.genders[code, g] - engine.gender_limit[code, g])
+            if excess <= 0: continue
+            cands = np.flatnonzero((engine.assign == g) & (engine.gender == code)).tolist()
+            rng.shuffle(cands)
+            cands.sort(key=lambda i: (destination_rank(i), engine.new_cams[engine.new_cam[i], g]))
+            for i in cands[:excess]:
+                engine.remove(i)
+
+    todo = sorted(np.flatnonzero(engine.assign < 0).tolist(), key=lambda i: engine.members[i]['birth_year'])
+    blocked = (~engine.eligible).astype(np.int64)
+    start = engine.assign.copy()
+    plain_tries = min(INCREMENTAL_PLAIN_TRIES, max_retries - 1)  # 처음 몇 번은 기존 멤버를 옮기지 않고 순서만 바꿔 봄
+    for attempt in range(1, max_retries + 1):
+        if not run_passes(engine, todo, rng) and attempt > plain_tries:
+            for i in todo:
+                if engine.assign[i] >= 0: continue
+                code = engine.gender[i]
+                if swap_into(engine, i, np.flatnonzero(engine.genders[code] < engine.gender_limit[code]), blocked) < 0:
+                    break
+        if (engine.assign[todo] >= 0).all():
+            return attempt, [i for i, g in kept.items() if engine.assign[i] != g]
+
+        # 이번 시도에서 바뀐 멤버만 시작 상태로 되돌림
+        changed = np.flatnonzero(engine.assign != start).tolist()
+        for i in changed:
+            if engine.assign[i] >= 0: engine.remove(i)
+        for i in changed:
+            if start[i] >= 0: engine.place(i, int(start[i]))
+    return None, [i for i, g in kept.items() if start[i] != g]
+
+# ------------------------------------------
+# 흐름 기반 배정 (최소 비용 흐름 + 교환 보정)
+# ------------------------------------------
 
-    return score
+class MinCostFlow:
+    """작은 그래프용 최소 비용 흐름 (퍼텐셜을 둔 다익스트라 최단 경로를 반복).
+    간선의 다음 한 단위 비용은 cost + step·(이미 흐른 양 // chunk)라, step > 0이면 볼록 비용(쌍 감점)을 간선 하나로 표현합니다.
+    비용이 chunk 단위로만 바뀌므로 경로 하나에 그 단위만큼 한꺼번에 흘려, 다익스트라 횟수가 흐름 양이 아니라
+    (흐름 양 / chunk)에 비례합니다. 간선 e의 역방향 잔여 간선은 번호 e ^ 1입니다."""
+
+    def __init__(self, n):
+        self.n = n
+        self.graph = [[] for _ in range(n)]
+        self.frm, self.to, self.cap, self.cost, self.step, self.chunk, self.flow = [], [], [], [], [], [], []
+
+    def add_edge(self, u, v, cap, cost=0.0, step=0.0, chunk=1):
+        k = len(self.to)
+        for lst, value in ((self.frm, u), (self.to, v), (self.cap, cap), (self.cost, cost), (self.step, step),
+                           (self.chunk, max(1, chunk)), (self.flow, 0)):
+            lst.append(value)
+        self.graph[u].append(2 * k)
+        self.graph[v].append(2 * k + 1)
+        return k
+
+    def _residual(self, e):
+        # (잔여 용량, 한 단위 비용, 도착 노드, 같은 비용으로 흘릴 수 있는 양)
+        k = e >> 1
+        f, step, chunk = self.flow[k], self.step[k], self.chunk[k]
+        if e & 1:
+            return f, -(self.cost[k] + step * ((f - 1) // chunk)), self.frm[k], (f - 1) % chunk + 1 if step else f
+        r = self.cap[k] - f
+        return r, self.cost[k] + step * (f // chunk), self.to[k], chunk - f % chunk if step else r
+
+    def solve(self, s, t, limit):
+        # s에서 t로 최대 limit만큼 최소 비용으로 흘리고 흘린 양을 돌려줍니다. (초기 비용은 모두 0 이상이어야 함)
+        inf = float('inf')
+        pi = [0.0] * self.n
+        total = 0
+        while total < limit:
+            dist = [inf] * self.n
+            prev = [-1] * self.n
+            dist[s] = 0.0
+            heap = [(0.0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]: continue
+                for e in self.graph[u]:
+                    r, c, v, _ = self._residual(e)
+                    if r <= 0: continue
+                    nd = d + c + pi[u] - pi[v]
+                    if nd < dist[v] - 1e-9:
+                        dist[v], prev[v] = nd, e
+                        heapq.heappush(heap, (nd, v))
+            if dist[t] == inf:
+                break
+            for v in range(self.n):
+                if dist[v] < inf: pi[v] += dist[v]
+
+            # 경로에서 비용이 바뀌지 않는 최대 양만큼 흘림
+            push, v, path = limit - total, t, []
+            while v != s:
+                e = prev[v]
+                push = min(push, self._residual(e)[3])
+                path.append(e)
+                v = self.to[e >> 1] if e & 1 else self.frm[e >> 1]
+            for e in path:
+                self.flow[e >> 1] += -push if e & 1 else push
+            total += push
+        return total
+
+    def total_cost(self):
+        total = 0.0
+        for c, st, chunk, f in zip(self.cost, self.step, self.chunk, self.flow):
+            q, rem = divmod(f, chunk)
+            total += c * f + st * (chunk * q * (q - 1) / 2 + rem * q)
+        return total
+
+def age_hall_witness(engine, male_total, female_total):
+    """조장 나이 조건만으로 배정이 불가능함을 보이는 반례를 찾습니다. 가능한 조는 생년에 대해 포함 관계이므로
+    (나이가 많을수록 갈 수 있는 조가 줄어듦) 성별마다 '생년 y 이하 인원 > 그 인원이 갈 수 있는 조의 최대 자리 수'인
+    y를 찾으면 됩니다. 반환: 설명 문자열 또는 None"""
+    G = engine.num_groups
+    for code, label, total in ((engine.male_code, '남자', male_total), (engine.female_code, '여자', female_total)):
+        if code < 0 or not total: continue
+        base, rem = divmod(total, G)
+        counts = np.bincount(engine.birth[engine.gender == code], minlength=len(engine.birth_values))
+        need = 0
+        for b in np.argsort(engine.birth_values):
+            need += int(counts[b])
+            k = int(engine.eligible[b].sum())
+            seats = k * base + min(k, rem)
+            if counts[b] and engine.birth_values[b] > 0 and need > seats:
+                return (f"{engine.birth_values[b]}년생까지의 {label} {need}명이 갈 수 있는 조는 {k}개뿐이라 "
+                        f"최대 {seats}자리밖에 없습니다.")
+    return None
+
+def flow_assign(engine, rng, strict_age=False):
+    """재시도 대신 최소 비용 흐름으로 (성별, 생년) 묶음별 조 인원표를 정한 뒤, 동명이인/신캠조는 교환으로 맞추는 휴리스틱 배정.
+    조장 나이 위반의 하한(min_age_violations)과 불가능 증명(proof)은 흐름에서 나오며, 결과는 engine에 남습니다."""
+    G, n = engine.num_groups, len(engine.members)
+    w = engine.weights
+    info = {'feasible': False, 'proof': None, 'age_violations': None, 'min_age_violations': None,
+            'repairs': 0, 'flow_cost': None}
+
+    # 흐름 없이도 바로 보이는 불가능 조건
+    male = engine.gender == engine.male_code
+    female = engine.gender == engine.female_code
+    if (~(male | female)).any():
+        info['proof'] = f"성별을 알 수 없는 참가자 {int((~(male | female)).sum())}명에게 줄 자리가 없습니다."
+        return info
+    name_counts = np.bincount(engine.name, minlength=1)
+    if n and name_counts.max() > G:
+        key = engine.members[int(np.argmax(engine.name == np.argmax(name_counts)))]['name_key']
+        info['proof'] = f"이름 키 '{key}'인 참가자 {int(name_counts.max())}명이 조 개수({G})보다 많아 동명이인을 피할 수 없습니다."
+        return info
+    new_cam_counts = np.bincount(engine.new_cam, minlength=1)
+    if n and new_cam_counts.max() > 3 * G:
+        info['proof'] = f"한 신캠조 인원 {int(new_cam_counts.max())}명이 조마다 3명씩 넣어도 남습니다. (최대 {3 * G}명)"
+        return info
+
+    # 1) 묶음별 조 인원표 (최소 비용 흐름). 갈 수 있는 생년이 같은 조끼리는 흐름에서 서로 바꿔도 같으므로
+    #    조 대신 그런 조의 종류로 노드를 만들고 (그래프 크기가 조 개수와 무관), 나중에 종류 안의 조에 고르게 나눕니다.
+    n_birth = len(engine.birth_values)
+    cls = engine.gender * n_birth + engine.birth
+    classes, class_of, class_size = np.unique(cls, return_inverse=True, return_counts=True)
+    genders = [(engine.male_code, int(male.sum())), (engine.female_code, int(female.sum()))]
+    types, type_of = np.unique(engine.eligible.T, axis=0, return_inverse=True)
+    type_groups = [np.flatnonzero(type_of.ravel() == t) for t in range(len(types))]
+
+    S, T, Z, Y = 0, 1, 2, 3
+    c0 = 4
+    ts0 = c0 + len(classes)          # (종류, 성별) 노드: ts0 + 2t + (0 남 / 1 여)
+    x0 = ts0 + 2 * len(types)        # 종류마다 +1명 자리를 모으는 노드
+    mcf = MinCostFlow(x0 + len(types))
+    extras = sum(total % G for _, total in genders)
+    mcf.add_edge(Z, T, min(G, extras))
+    mcf.add_edge(Y, T, max(0, extras - G))  # 남/여 +1명이 합쳐서 G개를 넘으면 모든 조가 적어도 한 명 더 받음
+    extra_edges = np.zeros((len(types), 2), dtype=np.int64)
+    for t, groups in enumerate(type_groups):
+        k = len(groups)
+        for s_idx, (_, total) in enumerate(genders):
+            mcf.add_edge(ts0 + 2 * t + s_idx, T, k * (total // G))
+            extra_edges[t, s_idx] = mcf.add_edge(ts0 + 2 * t + s_idx, x0 + t, k)
+        mcf.add_edge(x0 + t, Z, k)
+        mcf.add_edge(x0 + t, Y, k)
+
+    # 조장 나이 위반은 생년 균형 비용 전체보다 큰 비용. 같은 묶음이 종류 안의 조에 고르게 퍼진다고 보면
+    # k개 조짜리 종류에 흐르는 j번째 사람의 생년 비용은 w·(j // k)라 chunk=k인 볼록 비용과 같습니다.
+    age_cost = w['birth_year'] * n + 1
+    class_edges = np.zeros((len(classes), len(types)), dtype=np.int64)
+    for c, (code, size) in enumerate(zip(classes, class_size)):
+        s_idx = 0 if code // n_birth == engine.male_code else 1
+        mcf.add_edge(S, c0 + c, int(size))
+        for t, groups in enumerate(type_groups):
+            class_edges[c, t] = mcf.add_edge(c0 + c, ts0 + 2 * t + s_idx, int(size),
+                                             0.0 if types[t, code % n_birth] else float(age_cost),
+                                             float(w['birth_year']), len(groups))
+    if mcf.solve(S, T, n) < n:
+        info['proof'] = "조별 남/여 자리 수를 맞추는 배정이 없습니다."
+        return info
+
+    flow = np.array(mcf.flow)
+    type_quota = flow[class_edges]
+    ineligible = ~types.T[classes % n_birth]
+    info['min_age_violations'] = int(type_quota[ineligible].sum())
+    info['flow_cost'] = mcf.total_cost()
+    if strict_age and info['min_age_violations']:
+        witness = age_hall_witness(engine, genders[0][1], genders[1][1])
+        info['proof'] = (witness or "") + (" " if witness else "") + \
+            f"조장 나이 조건을 모두 지키는 배정이 없습니다. (최소 위반 {info['min_age_violations']}명)"
+        return info
+
+    # 종류별 +1명 자리를 조에 나눔: 남자는 앞쪽 조부터, 여자는 뒤쪽 조부터 채워 한 조가 둘 다 받는 경우를
+    # 흐름이 허용한 만큼(Y)으로만 만듭니다. 묶음 인원은 남은 자리가 많은 조부터 한 명씩 돌아가며 나눕니다.
+    seats = np.zeros((G, 2), dtype=np.int64)
+    quota = np.zeros((len(classes), G), dtype=np.int64)
+    for t, groups in enumerate(type_groups):
+        for s_idx, (_, total) in enumerate(genders):
+            seats[groups, s_idx] = total // G
+            extra = int(flow[extra_edges[t, s_idx]])
+            if extra:
+                seats[groups[:extra] if s_idx == 0 else groups[-extra:], s_idx] += 1
+            remaining = seats[groups, s_idx].copy()
+            for c in np.argsort(-type_quota[:, t], kind='stable'):
+                amount = int(type_quota[c, t])
+                if not amount or (classes[c] // n_birth == engine.male_code) != (s_idx == 0):
+                    continue
+                while amount:
+                    take = np.argsort(-remaining, kind='stable')[:min(amount, int((remaining > 0).sum()))]
+                    quota[c, groups[take]] += 1
+                    remaining[take] -= 1
+                    amount -= len(take)
+    engine.reset(seats[:, 0], seats[:, 1])
+
+    # 2) 인원표 안에서 멤버 배치 (동명이인이 많은 멤버, 갈 수 있는 조가 적은 묶음부터)
+    options = (quota > 0).sum(axis=1)
+    keys = [(-int(engine.name_dups[i]), int(options[class_of[i]]), rng.random()) for i in range(n)]
+    order = sorted(range(n), key=keys.__getitem__)
+    blocked = (~engine.eligible).astype(np.int64)
+    unresolved = []
+    for i in order:
+        c = class_of[i]
+        score = engine.scores(i, ignore_age=True)
+        score[quota[c] <= 0] = -np.inf
+        top = score.max()
+        if top > -np.inf:
+            best = np.flatnonzero(score == top)  # 최고점이 여럿이면 무작위
+            g = int(best[rng.randrange(len(best))])
+            engine.place(i, g)
+            quota[c, g] -= 1
+        else:
+            g = swap_into(engine, i, np.flatnonzero(quota[c] > 0), blocked)
+            if g < 0:
+                unresolved.append(i)
+                continue
+            quota[c, g] -= 1
+            info['repairs'] += 1
+
+    if unresolved:
+        # 증명도 배정도 아닌 경우: 흐름 밖의 동명이인/신캠조 조건을 교환으로 풀지 못했을 뿐, 불가능이 증명된 것은 아님
+        info['unresolved'] = [engine.members[i]['name'] for i in unresolved]
+        return info
+    info['feasible'] = True
+    info['age_violations'] = int(blocked[engine.birth, engine.assign].sum())
+    return info
+
+def flow_failure_text(info):
+    # flow_assign이 실패했을 때의 설명. 증명이 있으면 증명, 없으면 풀지 못한 참가자와 '증명 아님' 안내
+    if info.get('proof'):
+        return f"가능한 배정이 없습니다: {info['proof']}"
+    names = info.get('unresolved') or []
+    shown = ', '.join(names[:10]) + (f" 외 {len(names) - 10}명" if len(names) > 10 else "")
+    return (f"{len(names)}명({shown})을 동명이인/신캠조 조건을 지키며 넣을 자리를 교환으로 찾지 못했습니다. "
+            "가능한 배정이 없다는 증명은 아니므로 --flow 없이 (재시도 배정으로) 다시 실행해 보세요.")
 
 # ==========================================
-# 2. 메인 로직 클래스
+# 5. 메인 로직 클래스
 # ==========================================
 
 class TeamBuilder:
@@ -169,6 +1439,28 @@ class TeamBuilder:
             'new_cam_max_penalty': 100      
         }
 
+        self.max_retries = 2000
+        self.workers = 1  # 2 이상이면 여러 코어에서 모든 시도를 돌려 최고 점수 배정 선택
+        self.refine_iterations = 0  # 국소 탐색 교환 시도 횟수 (0: 제한 없음)
+        self.refine_seconds = 0.0   # 국소 탐색 시간 예산 (초, 둘 다 0이면 생략)
+        self.most_constrained_first = True  # 갈 수 있는 조가 적은 멤버부터 배정 (False: 생년 순)
+        self.time_budget = 0.0  # 0보다 크면 시도 횟수 대신 이 시간(초) 동안 탐색해 최고 점수 배정 선택
+        self.shards = 0  # 2 이상이면 조를 이만큼 묶음으로 나눠 묶음별로 따로 배정한 뒤 합침 (대규모 인원용)
+        self.flow = False  # True면 재시도 대신 최소 비용 흐름 + 교환 보정으로 배정 (휴리스틱, 조장 나이 위반 하한 계산)
+        self.strict_age = False  # 흐름 배정에서 조장 나이 조건을 하드 조건으로 (지킬 수 없으면 증명과 함께 실패)
+        self.changes = {}  # 증분 배정에서 이전 결과와 달라진 참가자 {행 번호: '신규' / 'a조 → b조'}
+        self.stats = {}  # 마지막 assign_teams 결과 요약 (시도 횟수, 균형 점수 등)
+        self.group_metrics = []  # 마지막 배정의 조별 지표 (evaluate_assignment의 'groups', 요약 시트에 사용)
+        self.load_issues = {}  # 읽는 중 문제가 된 행 {설명: [엑셀 행 번호, ...]}
+        self.cache_dir = None  # 지정하면 파일 내용 해시별로 변환된 조장/참가자 정보와 배정 결과를 저장해 재사용
+        self.seed = None  # 배정 난수 시드 (None이면 실행마다 새로 뽑아 stats['seed']에 기록)
+        self.sources = []  # 읽은 조장/참가자 파일 경로 (결과 캐시 키에 내용 해시로 사용)
+        self.telemetry = None  # Telemetry를 넣으면 단계별 시간과 하드 조건 탈락 횟수를 기록
+
+    def _phase(self, name):
+        # 계측이 켜져 있으면 단계 시간을 재는 with 블록
+        return self.telemetry.timer(name) if self.telemetry else nullcontext()
+
     # 약관 동의 기능
     def agree_to_terms(self):
         print()
@@ -218,11 +1510,13 @@ class TeamBuilder:
             else:
                 console.print("[red]⚠️ 'y' 또는 'n'만 입력해주세요.[/red]")
 
-    def load_data(self):
-        year_input = console.input("[bold yellow]⚡ 행사 연도 (4자리)를 입력하세요[/bold yellow] [dim](예: 2025)[/dim]: ").strip()
-        
-        leader_file = f"{year_input}ST_leader.xlsx"
-        member_file = f"{year_input}ST_freshmen.xlsx"
+    def load_data(self, leader_file=None, member_file=None):
+        # 파일 경로를 주지 않으면 연도를 입력받아 '연도ST_leader.xlsx' / '연도ST_freshmen.xlsx'를 찾음
+        if leader_file is None or member_file is None:
+            year_input = console.input("[bold yellow]⚡ 행사 연도 (4자리)를 입력하세요[/bold yellow] [dim](예: 2025)[/dim]: ").strip()
+            
+            leader_file = find_input_file(f"{year_input}ST_leader")
+            member_file = find_input_file(f"{year_input}ST_freshmen")
         
         console.print(f"\n[bold]📂 파일 탐색 중...[/bold]")
         
@@ -233,44 +1527,27 @@ class TeamBuilder:
             
         if not os.path.exists(member_file):
             console.print(f"[error]❌ 오류: '{member_file}' 파일을 찾을 수 없습니다.[/error]")
-            console.print("[dim]참가자 파일명은 '연도ST_freshmen.xlsx' 형식이어야 합니다.[/dim]")
+            console.print("[dim]참가자 파일명은 '연도ST_freshmen.xlsx' 형식이어야 합니다. (.csv, .parquet도 가능)[/dim]")
             return False
 
+        self.sources = [leader_file, member_file]
         console.print(f"   [success]✔[/success] 조장 파일: [underline]{leader_file}[/underline]")
         console.print(f"   [success]✔[/success] 참가자 파일: [underline]{member_file}[/underline]")
 
         try:
-            with console.status("[bold cyan]조장 정보를 분석하는 중...", spinner="dots"):
-                l_df = pd.read_excel(leader_file)
-                
-                year_cols = [c for c in l_df.columns if '생년' in str(c) or 'year' in str(c).lower()]
-                group_col = [c for c in l_df.columns if '조' in str(c) and '번호' in str(c)]
-                
-                use_indices = False
-                if len(year_cols) < 2: use_indices = True
-                
-                count = 0
-                max_group_id = 0
-
-                for idx, row in l_df.iterrows():
-                    try:
-                        if group_col: g_id = int(row[group_col[0]])
-                        else: g_id = int(row.iloc[0])
-                        
-                        if g_id > max_group_id: max_group_id = g_id
-
-                        if use_indices:
-                            y1 = smart_get_year(row.iloc[2]) 
-                            y2 = smart_get_year(row.iloc[4])
-                        else:
-                            y1 = smart_get_year(row[year_cols[0]])
-                            y2 = smart_get_year(row[year_cols[1]])
-                        
-                        self.leaders[g_id] = min(y1, y2)
-                        count += 1
-                    except: continue
-                
-                self.num_groups = max_group_id
+            with self._phase('load_leaders'):
+                cache_path, cached = self._read_cache('leader', leader_file)
+                if cached:
+                    self.leaders.update(cached['leaders'])
+                    self.num_groups = cached['num_groups']
+                else:
+                    issues_before = set(self.load_issues)
+                    if not self._parse_leaders(leader_file):
+                        return False
+                    self._write_cache(cache_path, {
+                        'leaders': self.leaders, 'num_groups': self.num_groups,
+                        'issues': {k: v for k, v in self.load_issues.items() if k not in issues_before},
+                    })
             
             if self.num_groups == 0:
                 console.print("[error]❌ 조 번호를 인식하지 못했습니다.[/error]")
@@ -283,48 +1560,19 @@ class TeamBuilder:
             return False
 
         try:
-            with console.status("[bold cyan]참가자 데이터를 처리하는 중...", spinner="dots"):
-                m_df = pd.read_excel(member_file)
-                
-                cols = m_df.columns
-                col_map = {}
-                for c in cols:
-                    c_str = str(c)
-                    if '성명' in c_str or '이름' in c_str: col_map['name'] = c
-                    elif '고교' in c_str or '고등학교' in c_str: col_map['highschool'] = c
-                    elif '신캠' in c_str: col_map['new_cam'] = c
-                    elif '학과' in c_str or '학부' in c_str: col_map['major'] = c
-                    elif '성별' in c_str: col_map['gender'] = c
-                    elif '전화' in c_str or '휴대폰' in c_str: col_map['phone'] = c
-                    elif '생년' in c_str or '주민' in c_str: col_map['birth'] = c
-
-                if len(col_map) < 7:
-                    console.print("[error]❌ 필수 컬럼 찾기 실패.[/error]")
-                    return False
-
-                processed_members = []
-                for idx, row in m_df.iterrows():
-                    name = str(row[col_map['name']])
-                    raw_birth = row[col_map['birth']]
-                    raw_gender = row[col_map['gender']]
-                    gender = normalize_gender(raw_gender)
-                    
-                    info = {
-                        'original_idx': idx,
-                        'name': name,
-                        'name_key': get_name_key(name),
-                        'birth_year': smart_get_year(raw_birth),
-                        'gender': gender, 
-                        'major': row[col_map['major']],
-                        'new_cam': int(row[col_map['new_cam']]),
-                        'highschool': row[col_map['highschool']],
-                        'phone': row[col_map['phone']],
-                        'raw_birth': raw_birth
-                    }
-                    processed_members.append(info)
-                
-                self.members = processed_members
-                self.df_members = m_df
+            with self._phase('load_freshmen'):
+                cache_path, cached = self._read_cache('freshmen', member_file)
+                if cached:
+                    self.members = cached['members']
+                    self.df_members = cached['df_members']
+                else:
+                    issues_before = set(self.load_issues)
+                    if not self._parse_members(member_file):
+                        return False
+                    self._write_cache(cache_path, {
+                        'members': self.members, 'df_members': self.df_members,
+                        'issues': {k: v for k, v in self.load_issues.items() if k not in issues_before},
+                    })
             
             console.print(f"   [info]➜ 참가자 인원:[/info] [highlight]{len(self.members)}명[/highlight]")
             
@@ -334,104 +1582,463 @@ class TeamBuilder:
             
         return True
 
-    def assign_teams(self):
-        # console.print("\n[bold white on dark_green] 🧩 조 배정 알고리즘 가동 [/bold white on dark_green]")
-        
+    def _read_cache(self, kind, path):
+        # 캐시 파일 이름에 원본 내용 해시가 들어가므로, 파일이 바뀌면 자연히 새로 파싱합니다.
+        if not self.cache_dir:
+            return None, None
+        name = f"{os.path.basename(path)}-{kind}-v{CACHE_VERSION}-{file_digest(path)[:24]}.pkl"
+        cache_path = os.path.join(self.cache_dir, name)
+        if not os.path.exists(cache_path):
+            return cache_path, None
+        try:
+            with open(cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return cache_path, None  # 깨진 캐시는 무시하고 다시 파싱
+
+        for label, rows in data['issues'].items():
+            self._record_issue(label, rows)
+        console.print(f"   [dim]⚡ 캐시 사용: {os.path.basename(cache_path)}[/dim]")
+        return cache_path, data
+
+    def _write_cache(self, cache_path, data, prune=True):
+        if not cache_path:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        if not prune:
+            return
+
+        # 같은 원본 파일의 예전 버전 캐시 정리
+        prefix = os.path.basename(cache_path).rsplit('-', 2)[0]
+        for old in glob.glob(os.path.join(glob.escape(self.cache_dir), glob.escape(prefix) + '-*.pkl')):
+            if old != cache_path:
+                os.remove(old)
+
+    def _make_rng(self):
+        # 배정 전용 난수 생성기 (전역 random은 건드리지 않음). 시드를 주지 않았으면 새로 뽑아 기록해 두어
+        # 같은 시드로 다시 실행하면 같은 배정이 나옵니다.
+        seed = self.seed if self.seed is not None else random.SystemRandom().getrandbits(32)
+        return seed, random.Random(seed)
+
+    def _result_cache_path(self, seed, previous=None):
+        # 입력 내용 해시 + 가중치 + 시드 + 엔진 옵션으로 정해지는 결과 캐시 경로.
+        # 시간 예산/국소 탐색 시간처럼 실행마다 결과가 달라지는 옵션을 쓰면 None (캐시 안 함)
+        if not self.cache_dir or len(self.sources) != 2 or self.time_budget > 0 or self.refine_seconds > 0:
+            return None
+        key = {
+            'version': RESULT_CACHE_VERSION,
+            'inputs': [file_digest(p) for p in self.sources + ([previous] if previous else [])],
+            'weights': self.weights, 'seed': seed, 'max_retries': self.max_retries,
+            'parallel': self.workers > 1,  # 병렬 탐색은 워커 수와 무관하게 같은 결과
+            'refine_iterations': self.refine_iterations, 'most_constrained_first': self.most_constrained_first,
+            'flow': self.flow, 'strict_age': self.strict_age, 'shards': self.shards, 'incremental': bool(previous),
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        inputs = hashlib.sha256(''.join(key['inputs']).encode()).hexdigest()
+        name = f"{os.path.basename(self.sources[1])}-result-v{RESULT_CACHE_VERSION}-{inputs[:16]}-{digest[:24]}.pkl"
+        return os.path.join(self.cache_dir, name)
+
+    def _load_result(self, cache_path):
+        # 저장된 배정을 불러와 결과 표를 다시 출력. 텔레메트리를 켰으면 실제로 돌려야 하므로 쓰지 않음
+        if not cache_path or self.telemetry or not os.path.exists(cache_path):
+            return False
+        try:
+            with open(cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return False
+        for name, value in data.items():
+            setattr(self, name, value)
+        self.stats['cached'] = True
+        console.print(f"\n[success]⚡ 같은 입력/가중치/시드의 저장된 배정을 사용합니다.[/success] [dim]({os.path.basename(cache_path)})[/dim]\n")
+        self._print_stats(self._build_status(self.result_groups))
+        self._print_metrics(self.stats['metrics'])
+        return True
+
+    def _save_result_cache(self, cache_path):
+        self._write_cache(cache_path, {
+            'result_groups': self.result_groups, 'male_limits': self.male_limits, 'female_limits': self.female_limits,
+            'total_limits': self.total_limits, 'changes': self.changes, 'stats': self.stats,
+            'group_metrics': self.group_metrics,
+        }, prune=False)
+        if not cache_path:
+            return
+
+        # 같은 참가자 파일의 예전 내용/버전 결과는 지우고, 같은 내용의 결과는 최근 RESULT_CACHE_KEEP개만 남김
+        current = os.path.basename(cache_path).rsplit('-', 1)[0] + '-'
+        pattern = glob.escape(os.path.basename(self.sources[1])) + '-result-*.pkl'
+        stale, same = [], []
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), pattern)):
+            (same if os.path.basename(path).startswith(current) else stale).append(path)
+        same.sort(key=os.path.getmtime, reverse=True)
+        for old in stale + same[RESULT_CACHE_KEEP:]:
+            os.remove(old)
+
+    def _parse_leaders(self, leader_file):
+        with console.status("[bold cyan]조장 정보를 분석하는 중...", spinner="dots"):
+            l_df = read_table(leader_file)
+            
+            year_cols = [c for c in l_df.columns if '생년' in str(c) or 'year' in str(c).lower()]
+            group_col = [c for c in l_df.columns if '조' in str(c) and '번호' in str(c)]
+            
+            use_indices = False
+            if len(year_cols) < 2: use_indices = True
+            
+            g_ids = pd.to_numeric(l_df[group_col[0]] if group_col else l_df.iloc[:, 0], errors='coerce')
+            if use_indices:
+                y1, bad1 = parse_birth_years(l_df.iloc[:, 2])
+                y2, bad2 = parse_birth_years(l_df.iloc[:, 4])
+            else:
+                y1, bad1 = parse_birth_years(l_df[year_cols[0]])
+                y2, bad2 = parse_birth_years(l_df[year_cols[1]])
+
+            valid = g_ids.notna().to_numpy()
+            self._report_rows("조 번호를 읽지 못해 건너뛴 조장 행", ~valid)
+            self._report_rows("조장 생년을 읽지 못한 행 (나이 제한 없이 처리)", (bad1 | bad2) & valid)
+
+            self.leaders.update(zip(g_ids[valid].astype('int64').tolist(), np.minimum(y1, y2)[valid].tolist()))
+            self.num_groups = max(self.leaders, default=0)
+        return True
+
+    def _parse_members(self, member_file):
+        with console.status("[bold cyan]참가자 데이터를 처리하는 중...", spinner="dots"):
+            m_df = read_table(member_file)
+            
+            cols = m_df.columns
+            col_map = {}
+            for c in cols:
+                c_str = str(c)
+                if '성명' in c_str or '이름' in c_str: col_map['name'] = c
+                elif '고교' in c_str or '고등학교' in c_str: col_map['highschool'] = c
+                elif '신캠' in c_str: col_map['new_cam'] = c
+                elif '학과' in c_str or '학부' in c_str: col_map['major'] = c
+                elif '성별' in c_str: col_map['gender'] = c
+                elif '전화' in c_str or '휴대폰' in c_str: col_map['phone'] = c
+                elif '생년' in c_str or '주민' in c_str: col_map['birth'] = c
+
+            if len(col_map) < 7:
+                console.print("[error]❌ 필수 컬럼 찾기 실패.[/error]")
+                return False
+
+            # 열 단위로 한 번에 변환 (생년 / 성별 / 이름 키 / 신캠조)
+            names = m_df[col_map['name']].astype(str).fillna('nan')
+            birth_years, bad_birth = parse_birth_years(m_df[col_map['birth']])
+            genders = normalize_genders(m_df[col_map['gender']])
+            new_cams = pd.to_numeric(m_df[col_map['new_cam']], errors='coerce')
+
+            self._report_rows("생년을 읽지 못한 참가자 행 (생년 0으로 처리)", bad_birth)
+            self._report_rows("성별이 남/여로 인식되지 않은 참가자 행", ~genders.isin(['남', '여']))
+            if self._report_rows("신캠조 번호를 읽지 못한 참가자 행", new_cams.isna(), level='error'):
+                return False
+
+            columns = {
+                'original_idx': m_df.index,
+                'name': names,
+                'name_key': get_name_keys(names),
+                'birth_year': birth_years,
+                'gender': genders,
+                'major': m_df[col_map['major']],
+                'new_cam': new_cams.astype('int64'),
+                'highschool': m_df[col_map['highschool']],
+                'phone': m_df[col_map['phone']],
+                'raw_birth': m_df[col_map['birth']],
+            }
+            
+            # 열 목록을 한 번에 파이썬 값으로 바꾼 뒤 행 dict로 묶음 (DataFrame.to_dict보다 빠름)
+            keys = list(columns)
+            values = [col.tolist() for col in columns.values()]
+            self.members = [dict(zip(keys, row)) for row in zip(*values)]
+            self.df_members = m_df
+        return True
+
+    def _report_rows(self, label, mask, level='warning'):
+        # 문제 행을 엑셀 행 번호(헤더 다음 줄이 2행)로 알려주고 load_issues에 기록
+        rows = (np.flatnonzero(np.asarray(mask)) + 2).tolist()
+        if rows:
+            self._record_issue(label, rows, level)
+        return len(rows)
+
+    def _record_issue(self, label, rows, level='warning'):
+        self.load_issues[label] = rows
+        preview = ', '.join(map(str, rows[:10])) + (' ...' if len(rows) > 10 else '')
+        console.print(f"   [{level}]⚠️ {label}: {len(rows)}개[/{level}] [dim](엑셀 행 {preview})[/dim]")
+
+    def _build_slot_pairs(self):
         # 1. 성별별 전체 인원 파악
         total_m = sum(1 for m in self.members if m['gender'] == '남')
         total_f = sum(1 for m in self.members if m['gender'] == '여')
-        
+
         # 2. 남자 슬롯 생성 (예: 105명/10조 -> 11명인 조 5개, 10명인 조 5개)
         base_m = total_m // self.num_groups
         rem_m = total_m % self.num_groups
         male_slots = [base_m + 1] * rem_m + [base_m] * (self.num_groups - rem_m)
-        
+
         # 3. 여자 슬롯 생성
         base_f = total_f // self.num_groups
         rem_f = total_f % self.num_groups
         female_slots = [base_f + 1] * rem_f + [base_f] * (self.num_groups - rem_f)
-        
+
         # console.print(f"[dim]ℹ️ 균형 설계: 남 {min(male_slots)}~{max(male_slots)}명 / 여 {min(female_slots)}~{max(female_slots)}명[/dim]")
 
-        max_retries = 2000 
+        # 4. 조별 총원 편차 1 이내가 되도록 남/여 슬롯 짝 구성 (시도마다 조 순서만 섞음)
+        slot_pairs = pair_slots(male_slots, female_slots)
+        if slot_pairs is None:
+            console.print("\n[error]❌ 남/여 슬롯을 조별 총원 편차 1 이내로 짝지을 수 없습니다.[/error]")
+        return slot_pairs
+
+    def assign_teams(self):
+        # console.print("\n[bold white on dark_green] 🧩 조 배정 알고리즘 가동 [/bold white on dark_green]")
+        with self._phase('slot_build'):
+            slot_pairs = self._build_slot_pairs()
+            if slot_pairs is None:
+                return False
+
+        seed, rng = self._make_rng()
+        cache_path = self._result_cache_path(seed)
+        if self._load_result(cache_path):
+            return True
+
+        max_retries = self.max_retries
         success = False
+        refined = None
+        flow_info = None
+        sharded = None
+        interrupted = False
+        start_time = time.perf_counter()
+
+        # 멤버 인코딩은 한 번만 수행하고, 시도마다 카운터만 초기화
+        with self._phase('engine_build'):
+            engine = ScoreEngine(self.members, self.num_groups, self.leaders, self.weights,
+                                 most_constrained=self.most_constrained_first)
+            engine.telemetry = self.telemetry
+            sorted_idx = sorted(range(len(self.members)), key=lambda i: self.members[i]['birth_year'])
         
         with console.status("[bold green]성비와 인원을 완벽하게 맞추는 중...[/bold green]", spinner="bouncingBar") as status:
-            for attempt in range(1, max_retries + 1):
-                random.shuffle(male_slots)
-                random.shuffle(female_slots)
-                
-                # 총원 편차 1 이내 유지 확인
-                temp_totals = [m + f for m, f in zip(male_slots, female_slots)]
-                if max(temp_totals) - min(temp_totals) > 1:
-                    continue 
-
-                self.male_limits = {i: c for i, c in zip(range(1, self.num_groups + 1), male_slots)}
-                self.female_limits = {i: c for i, c in zip(range(1, self.num_groups + 1), female_slots)}
-                self.total_limits = {i: m+f for i, m, f in zip(range(1, self.num_groups+1), male_slots, female_slots)}
-
-                group_status = {
-                    i: {
-                        'count': 0, 'names': [], 'genders': {},
-                        'majors': {}, 'birth_years': {}, 'new_cam': {}
-                    } for i in range(1, self.num_groups + 1)
-                }
-                assignments = {m['original_idx']: None for m in self.members}
-                
-                sorted_members = sorted(self.members, key=lambda x: x['birth_year'])
-
-                def try_assign(member_list, ignore_age=False):
-                    failed = []
-                    for member in member_list:
-                        best_group = -1
-                        best_score = -float('inf')
-                        candidates = list(range(1, self.num_groups + 1))
-                        random.shuffle(candidates)
-                        
-                        for g_id in candidates:
-                            # limits_config를 통해 성별/총원 제한 전달
-                            score = calculate_score(g_id, member, group_status, 
-                                                 {'leader_years': self.leaders}, self.weights, 
-                                                 ignore_age=ignore_age, 
-                                                 limits_config={
-                                                     'total': self.total_limits[g_id],
-                                                     'male': self.male_limits[g_id],
-                                                     'female': self.female_limits[g_id]
-                                                 })
-                            if score > best_score:
-                                best_score = score
-                                best_group = g_id
-                        
-                        if best_group != -1 and best_score > -float('inf'):
-                            assignments[member['original_idx']] = best_group
-                            self._update_status(group_status, best_group, member)
-                        else:
-                            failed.append(member)
-                    return failed
-
-                # 1차~3차 배정 시도
-                unassigned = try_assign(sorted_members, ignore_age=False)
-                if unassigned: unassigned = try_assign(unassigned, ignore_age=False)
-                if unassigned: unassigned = try_assign(unassigned, ignore_age=True)
-                
-                # 최후의 수단
-                if unassigned:
-                     unassigned = try_assign(unassigned, ignore_age=True)
+            with self._phase('search'):
+                if self.flow:
+                    status.update("[bold green]최소 비용 흐름으로 배정 중...[/bold green]")
+                    flow_info = flow_assign(engine, rng, self.strict_age)
+                    success, attempt, feasible = flow_info['feasible'], 1, None
+                    if success:
+                        male_slots, female_slots = engine.male_limit.copy(), engine.female_limit.copy()
+                elif self.shards > 1:
+                    def on_progress(done, total):
+                        status.update(f"[bold yellow]묶음별 배정 중... ({done}/{total})[/bold yellow]")
 
-                if not unassigned:
-                    success = True
-                    self.result_groups = assignments
-                    break
-                
-                if attempt % 100 == 0:
-                    status.update(f"[bold yellow]재시도 중... (Attempt {attempt})[/bold yellow]")
+                    base_seed = rng.getrandbits(32)
+                    shard_retries = min(max_retries, 100)  # 못 푼 묶음은 합친 뒤 보정하므로 묶음 재시도는 짧게
+                    attempt = 0
+                    for round_no in range(3):  # 보정까지 실패하면 슬롯을 다시 섞어 재시도
+                        tries, repaired = shard_assign(engine, self.leaders, slot_pairs, self.shards, self.workers,
+                                                       base_seed + round_no * self.shards, shard_retries, rng, on_progress)
+                        attempt += tries
+                        if repaired is not None:
+                            success = True
+                            sharded = {'shards': min(self.shards, self.num_groups), 'repaired': repaired, 'rounds': round_no + 1}
+                            male_slots, female_slots = engine.male_limit.copy(), engine.female_limit.copy()
+                            break
+                elif self.time_budget > 0:
+                    def on_progress(done, feasible, best_score):
+                        left = max(0.0, self.time_budget - (time.perf_counter() - start_time))
+                        best_str = f", 최고 점수 {best_score:,.0f}" if best_score is not None else ""
+                        status.update(f"[bold yellow]시간 예산 탐색 중... (남은 {left:.0f}초, 시도 {done}회, 가능한 배정 {feasible}개{best_str}) "
+                                      f"[dim]Ctrl-C: 지금까지의 최고 배정으로 마침[/dim][/bold yellow]")
+
+                    tried, feasible, best, interrupted = anytime_search(engine, slot_pairs, sorted_idx, self.time_budget,
+                                                                        self.workers, rng.getrandbits(32), on_progress)
+                    if best is not None:
+                        success = True
+                        score, attempt, assign, male_slots, female_slots = best
+                        engine.load(assign, male_slots, female_slots)
+                elif self.workers > 1:
+                    def on_progress(done, feasible):
+                        status.update(f"[bold yellow]병렬 탐색 중... ({min(done, max_retries)}/{max_retries}회, 가능한 배정 {feasible}개)[/bold yellow]")
+
+                    feasible, best = parallel_search(engine, slot_pairs, sorted_idx, max_retries,
+                                                     self.workers, rng.getrandbits(32), on_progress)
+                    if best is not None:
+                        success = True
+                        score, attempt, assign, male_slots, female_slots = best
+                        engine.load(assign, male_slots, female_slots)
+                else:
+                    for attempt in range(1, max_retries + 1):
+                        if run_attempt(engine, slot_pairs, sorted_idx, rng):
+                            success = True
+                            male_slots, female_slots = engine.male_limit.copy(), engine.female_limit.copy()
+                            break
+                    
+                        if attempt % 100 == 0:
+                            status.update(f"[bold yellow]재시도 중... (Attempt {attempt})[/bold yellow]")
+
+            if success and not interrupted and (self.refine_iterations or self.refine_seconds):
+                status.update("[bold green]조원 교환으로 균형을 다듬는 중...[/bold green]")
+                with self._phase('refine'):
+                    refined = refine_assignment(engine, rng, self.refine_iterations, self.refine_seconds)
 
         if success:
-            console.print(f"\n[success]✨ 배정 성공! (총 시도: {attempt}회)[/success]\n")
-            self._print_stats(group_status)
+            self.result_groups = engine.assignments()
+            self.male_limits = {i: int(c) for i, c in zip(range(1, self.num_groups + 1), male_slots)}
+            self.female_limits = {i: int(c) for i, c in zip(range(1, self.num_groups + 1), female_slots)}
+            self.total_limits = {i: int(m + f) for i, m, f in zip(range(1, self.num_groups + 1), male_slots, female_slots)}
+            self.stats = {
+                'success': True, 'seed': seed, 'attempts': attempt, 'score': engine.total_score(),
+                'feasible': feasible if (self.workers > 1 or self.time_budget > 0) and not (flow_info or sharded) else None,
+                'refine': refined,
+                'seconds': time.perf_counter() - start_time, 'metrics': evaluate_assignment(engine, per_group=True),
+            }
+            self.group_metrics = self.stats['metrics'].pop('groups')
+            if flow_info:
+                self.stats['flow'] = flow_info
+            elif sharded:
+                self.stats['shards'] = sharded
+            elif self.time_budget > 0:
+                self.stats.update(tried=tried, interrupted=interrupted)
+            self._save_result_cache(cache_path)
+
+            if flow_info:
+                optimal = "최소값" if flow_info['age_violations'] == flow_info['min_age_violations'] else \
+                    f"하한 {flow_info['min_age_violations']}명"
+                console.print(f"\n[success]✨ 흐름 배정 성공! (조장 나이 위반 {flow_info['age_violations']}명, {optimal}, "
+                              f"교환 보정 {flow_info['repairs']}회)[/success]\n")
+            elif sharded:
+                console.print(f"\n[success]✨ 분할 배정 성공! ({sharded['shards']}개 묶음, 묶음 시도 합계 {attempt}회, "
+                              f"합친 뒤 보정 {sharded['repaired']}명)[/success]\n")
+            elif self.time_budget > 0:
+                stopped = "Ctrl-C로 중단, " if interrupted else ""
+                console.print(f"\n[success]✨ 배정 성공! ({stopped}{tried}회 시도 중 가능한 배정 {feasible}개, "
+                              f"최고 점수 {score:,.0f}, {attempt}번째 시도)[/success]\n")
+            elif self.workers > 1:
+                console.print(f"\n[success]✨ 배정 성공! (가능한 배정 {feasible}개 중 최고 점수 {score:,.0f}, {attempt}번째 시도)[/success]\n")
+            else:
+                console.print(f"\n[success]✨ 배정 성공! (총 시도: {attempt}회)[/success]\n")
+            console.print(f"[dim]🎲 시드 {seed} (같은 입력과 옵션에 이 시드를 주면 같은 배정이 나옵니다)[/dim]\n")
+            if refined:
+                console.print(f"[info]🔧 국소 탐색:[/info] 균형 점수 {refined['start']:,.0f} → {refined['end']:,.0f} "
+                              f"[dim](교환 {refined['accepted']}/{refined['iterations']}회, {refined['seconds']:.1f}초)[/dim]\n")
+            self._print_stats(self._build_status(self.result_groups))
+            self._print_metrics(self.stats['metrics'])
+        elif flow_info:
+            label = "" if flow_info['proof'] else "흐름 배정 실패: "
+            console.print(f"\n[error]❌ {label}{flow_failure_text(flow_info)}[/error]")
+            self.stats = {'success': False, 'seed': seed, 'attempts': 1, 'seconds': time.perf_counter() - start_time,
+                          'flow': flow_info}
         else:
+            if self.time_budget > 0:
+                max_retries = tried
+                if interrupted:
+                    console.print("\n[warning]⏹ Ctrl-C로 탐색을 중단했습니다.[/warning]")
             console.print(f"\n[error]❌ [치명적 오류] {max_retries}번을 시도했으나 배정에 실패했습니다.[/error]")
-            console.print("이유: 동명이인 등 하드 조건이 너무 까다롭거나 성비 슬롯 매칭이 어렵습니다.")
+            console.print("이유: 동명이인 등 하드 조건이 너무 까다롭습니다.")
+            if self.telemetry:
+                rej = self.telemetry.rejections
+                total = sum(rej.values()) or 1
+                console.print("[dim]   탈락 원인: " + ', '.join(f"{RULE_LABELS[r]} {rej[r] / total:.0%}"
+                                                         for r in self.telemetry.top_rules()) + "[/dim]")
+            self.stats = {'success': False, 'seed': seed, 'attempts': max_retries, 'seconds': time.perf_counter() - start_time}
+            if self.time_budget > 0:
+                self.stats['interrupted'] = interrupted
+
+        return success
+
+    def load_previous(self, result_file):
+        # 이전 결과 파일의 '최종 배정 조'를 현재 명단과 (이름, 전화번호)로 맞춤
+        # 반환: ({참가자 행 번호: 조 번호}, 명단에서 빠진 인원 수), 실패 시 (None, 0)
+        if not os.path.exists(result_file):
+            console.print(f"[error]❌ 오류: 이전 결과 파일 '{result_file}'을 찾을 수 없습니다.[/error]")
+            return None, 0
+        try:
+            prev = read_table(result_file)
+        except Exception as e:
+            console.print(f"[error]❌ 이전 결과 파일 읽기 실패: {e}[/error]")
+            return None, 0
+        if '최종 배정 조' not in prev.columns:
+            console.print("[error]❌ 이전 결과 파일에 '최종 배정 조' 열이 없습니다.[/error]")
+            return None, 0
+
+        prev_keys = member_keys(prev)
+        prev_groups = dict(zip(prev_keys, pd.to_numeric(prev['최종 배정 조'], errors='coerce').tolist()))
+        keys = member_keys(self.df_members)
+        previous = {idx: int(prev_groups[k]) for idx, k in zip(self.df_members.index, keys)
+                    if k in prev_groups and 1 <= prev_groups[k] <= self.num_groups}
+        removed = int((~prev_keys.isin(set(keys))).sum())
+        return previous, removed
+
+    def assign_incremental(self, result_file):
+        """이전 결과 파일의 배정을 그대로 두고, 새로 온 참가자만 배정합니다.
+        이전 결과에는 있지만 현재 명단에 없는 참가자는 취소로 보고 빼며, 그 때문에 조의 성별 한도를 넘은
+        경우에만 넘은 인원만큼 다른 조로 옮깁니다. 동명이인/신캠조 제한으로 들어갈 빈자리가 없는 참가자가 있으면
+        기존 참가자 한 명을 빈자리로 옮겨 자리를 만듭니다. 국소 탐색(refine)은 기존 배정을 바꾸므로 하지 않습니다."""
+        previous, removed = self.load_previous(result_file)
+        if previous is None:
+            return False
+
+        with self._phase('slot_build'):
+            slot_pairs = self._build_slot_pairs()
+            if slot_pairs is None:
+                return False
+
+        seed, rng = self._make_rng()
+        cache_path = self._result_cache_path(seed, result_file)
+        if self._load_result(cache_path):
+            return True
+
+        start_time = time.perf_counter()
+        with self._phase('engine_build'):
+            engine = ScoreEngine(self.members, self.num_groups, self.leaders, self.weights,
+                                 most_constrained=self.most_constrained_first)
+            engine.telemetry = self.telemetry
+            index = {m['original_idx']: i for i, m in enumerate(self.members)}
+            kept = {index[idx]: g - 1 for idx, g in previous.items()}
+
+        with console.status("[bold green]기존 배정을 유지한 채 변경 인원을 배정하는 중...[/bold green]", spinner="bouncingBar"), \
+                self._phase('search'):
+            attempt, movers = incremental_assign(engine, kept, slot_pairs, rng, self.max_retries)
+
+        added = len(self.members) - len(kept)
+        if attempt is None:
+            console.print(f"\n[error]❌ [치명적 오류] {self.max_retries}번을 시도했으나 새 참가자 {added}명을 배정하지 못했습니다.[/error]")
+            console.print("이유: 기존 배정을 유지한 채로는 동명이인 등 하드 조건을 맞출 수 없습니다. (전체 재배정을 고려하세요)")
+            self.stats = {'success': False, 'seed': seed, 'attempts': self.max_retries, 'seconds': time.perf_counter() - start_time}
+            return False
+
+        self.result_groups = engine.assignments()
+        groups = range(1, self.num_groups + 1)
+        self.male_limits = {g: int(c) for g, c in zip(groups, engine.male_limit)}
+        self.female_limits = {g: int(c) for g, c in zip(groups, engine.female_limit)}
+        self.total_limits = {g: int(c) for g, c in zip(groups, engine.total_limit)}
+        self.changes = {self.members[i]['original_idx']: '신규' for i in range(len(self.members)) if i not in kept}
+        self.changes.update({self.members[i]['original_idx']: f"{kept[i] + 1}조 → {engine.assign[i] + 1}조" for i in movers})
+        self.stats = {
+            'success': True, 'seed': seed, 'attempts': attempt, 'score': engine.total_score(), 'refine': None,
+            'seconds': time.perf_counter() - start_time,
+            'kept': len(kept) - len(movers), 'added': added, 'removed': removed, 'moved': len(movers),
+            'metrics': evaluate_assignment(engine, per_group=True),
+        }
+        self.group_metrics = self.stats['metrics'].pop('groups')
+        self._save_result_cache(cache_path)
+
+        console.print(f"\n[success]✨ 증분 배정 성공! (유지 {len(kept) - len(movers)}명, 신규 {added}명, "
+                      f"취소 {removed}명, 이동 {len(movers)}명)[/success]\n")
+        self._print_stats(self._build_status(self.result_groups))
+        self._print_metrics(self.stats['metrics'])
+        return True
+
+    def _build_status(self, assignments):
+        status = {
+            i: {
+                'count': 0, 'names': [], 'genders': {},
+                'majors': {}, 'birth_years': {}, 'new_cam': {}
+            } for i in range(1, self.num_groups + 1)
+        }
+        for member in self.members:
+            g_id = assignments.get(member['original_idx'])
+            if g_id is not None:
+                self._update_status(status, g_id, member)
+        return status
 
     def _update_status(self, status, g_id, member):
         st = status[g_id]
@@ -469,28 +2076,30 @@ class TeamBuilder:
             )
         console.print(table)
 
-    def save_result(self):
-        console.print("\n[bold]💾 결과 저장 중...[/bold]")
-        
-        self.df_members['최종 배정 조'] = self.df_members.index.map(self.result_groups)
-        
-        phone_col = None
-        for c in self.df_members.columns:
-            if '전화' in str(c) or 'phone' in str(c).lower():
-                phone_col = c
-                break
-        if phone_col:
-            self.df_members[phone_col] = self.df_members[phone_col].apply(format_phone_number)
+    def _print_metrics(self, metrics):
+        m = metrics
+        console.print(f"[dim]📏 성비 편차 ±{m['gender_ratio_dev']:.1%} · 학과 엔트로피 최소 {m['major_entropy_min']:.2f} · "
+                      f"평균 생년 편차 {m['birth_mean_spread']:.2f} · 신캠조 1명 {m['new_cam_singletons']} · "
+                      f"조장 나이 위반 {m['age_violations']}[/dim]")
 
-        gender_col = next((c for c in self.df_members.columns if '성별' in str(c) or 'gender' in str(c).lower()), None)
+    def result_frame(self):
+        # 저장할 결과 표: 배정 조/변경 열을 붙이고 전화번호/성별을 열 단위로 정리 (df_members는 그대로 둠)
+        df = self.df_members.copy(deep=False)
+        df['최종 배정 조'] = df.index.map(self.result_groups)
+        if self.changes:
+            df['배정 변경'] = df.index.map(self.changes).fillna('')
+
+        phone_col = next((c for c in df.columns if '전화' in str(c) or 'phone' in str(c).lower()), None)
+        if phone_col:
+            df[phone_col] = format_phone_numbers(df[phone_col])
+        gender_col = next((c for c in df.columns if '성별' in str(c) or 'gender' in str(c).lower()), None)
         if gender_col:
-            self.df_members[gender_col] = self.df_members[gender_col].apply(format_gender_output)
+            df[gender_col] = format_genders_output(df[gender_col])
 
-        cols = self.df_members.columns.tolist()
-        target_order = ['최종 배정 조']
+        cols = df.columns.tolist()
+        target_order = ['최종 배정 조'] + (['배정 변경'] if self.changes else [])
         priority_cols = ['성명', '출신고교명', '신캠조', '학과', '학부', '성별', '전화번호', '생년월일']
-        added = set(['최종 배정 조'])
-        
+        added = set(target_order)
         for p_key in priority_cols:
             for c in cols:
                 if p_key in c and c not in added:
@@ -499,23 +2108,449 @@ class TeamBuilder:
                     break
         for c in cols:
             if c not in added: target_order.append(c)
-        
-        name_col = next((c for c in self.df_members.columns if '성명' in str(c) or '이름' in str(c)), '성명')
-        final_df = self.df_members[target_order].sort_values(by=['최종 배정 조', name_col])
-        
-        filename = f"team_result_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-        final_df.to_excel(filename, index=False)
-        
+
+        name_col = next((c for c in df.columns if '성명' in str(c) or '이름' in str(c)), '성명')
+        return df[target_order].sort_values(by=['최종 배정 조', name_col])
+
+    def summary_rows(self):
+        # 요약 시트 내용: 실행 정보, 전체 균형 지표, 조별 지표 표
+        stats = self.stats
+        rows = [['실행 정보'], ['저장 시각', datetime.now().strftime('%Y-%m-%d %H:%M')],
+                ['조 개수', self.num_groups], ['참가자 수', len(self.members)]]
+        for key, label in (('seed', '시드'), ('attempts', '시도 횟수'), ('score', '균형 점수'), ('seconds', '배정 시간(초)'),
+                           ('kept', '유지'), ('added', '신규'), ('removed', '취소'), ('moved', '이동')):
+            if stats.get(key) is not None:
+                rows.append([label, round(stats[key], 2) if isinstance(stats[key], float) else stats[key]])
+
+        rows += [[], ['균형 지표']]
+        for key, label in METRIC_LABELS.items():
+            if key in stats.get('metrics', {}):
+                rows.append([label, round(stats['metrics'][key], 4)])
+
+        rows += [[], ['조별 지표'], ['조', '인원', '남', '여', '성비 편차', '학과 엔트로피', '평균 생년', '생년 분산',
+                                    '신캠 1명', '신캠 묶음', '나이 위반']]
+        for g in self.group_metrics:
+            rows.append([f"{g['group']}조", g['size'], g['male'], g['female'], round(g['male_ratio_dev'], 4),
+                         round(g['major_entropy'], 4), round(g['birth_mean'], 2), round(g['birth_var'], 4),
+                         g['new_cam_singletons'], g['new_cam_clusters'], g['age_violations']])
+        return rows
+
+    def save_result(self, filename=None, formats=None, group_sheets=True):
+        """결과를 저장하고 저장한 파일 경로 목록을 돌려줍니다.
+        formats는 'xlsx'/'csv'/'parquet' 중 저장할 형식 목록으로, 없으면 filename 확장자를 따릅니다.
+        xlsx는 쓰기 전용(스트리밍) 모드로 전체 명단, 요약, 조별 시트를 씁니다. (group_sheets=False면 조별 시트 생략)"""
+        console.print("\n[bold]💾 결과 저장 중...[/bold]")
+
+        if filename is None:
+            filename = f"team_result_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+        stem, ext = os.path.splitext(filename)
+        ext = ext.lower().lstrip('.')
+        formats = list(dict.fromkeys(formats or [ext if ext in RESULT_FORMATS else 'xlsx']))
+        unknown = set(formats) - set(RESULT_FORMATS)
+        if unknown:
+            raise ValueError(f"알 수 없는 저장 형식: {', '.join(sorted(unknown))}")
+        check_parquet_support([], formats)  # xlsx/csv를 쓴 뒤에 실패하지 않도록 먼저 확인
+
+        saved = []
+        with self._phase('save'):
+            final_df = self.result_frame()
+            for fmt in formats:
+                path = filename if fmt == ext else f"{stem}.{fmt}"
+                if fmt == 'xlsx':
+                    sheets = [('전체 명단', final_df), ('요약', self.summary_rows())]
+                    if group_sheets:
+                        sheets += [(f"{int(g)}조", part) for g, part in final_df.groupby('최종 배정 조', sort=True)]
+                    write_xlsx_streaming(path, sheets)
+                elif fmt == 'csv':
+                    final_df.to_csv(path, index=False, encoding='utf-8-sig')  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+                else:
+                    # pyarrow는 숫자/문자가 섞인 object 열을 못 쓰므로 문자열로 통일
+                    obj = final_df.select_dtypes(include='object').columns
+                    final_df.astype({c: 'string' for c in obj}).to_parquet(path, index=False)
+                saved.append(path)
+
         console.print(f"[success]✔ 모든 작업이 완료되었습니다![/success]")
-        console.print(f"   📂 저장된 파일: [underline bold]{filename}[/underline bold]\n")
+        for path in saved:
+            console.print(f"   📂 저장된 파일: [underline bold]{path}[/underline bold]")
+        console.print()
+        return saved
+
+    def group_summary(self):
+        # 조별 인원/성비 요약 (_print_stats 표와 같은 내용을 데이터로)
+        status = self._build_status(self.result_groups)
+        return {
+            g_id: {'count': st['count'], 'male': st['genders'].get('남', 0), 'female': st['genders'].get('여', 0)}
+            for g_id, st in status.items()
+        }
+
+# ==========================================
+# 6. 비대화형 실행 (API / CLI)
+# ==========================================
+
+def check_weights(weights, known):
+    # 모르는 가중치 항목(오타 등)이 말없이 무시되지 않도록 ValueError로 알림
+    unknown = set(weights or ()) - set(known)
+    if unknown:
+        raise ValueError(f"알 수 없는 가중치 항목: {', '.join(sorted(unknown))}")
+
+def check_options(previous=None, flow=False, shards=0, time_budget=0.0, workers=1, strict_age=False, label=str):
+    # 함께 주면 한쪽이 말없이 무시되던 옵션 조합을 ValueError로 알림. label은 옵션 이름 표시용 (CLI는 --플래그)
+    used = {'flow': flow, 'shards': shards > 1, 'time_budget': time_budget > 0, 'workers': workers != 1}
+    rules = [('previous', bool(previous), ['flow', 'shards', 'time_budget', 'workers']),
+             ('flow', flow, ['shards', 'time_budget']), ('shards', shards > 1, ['time_budget'])]
+    for name, on, others in rules:
+        clash = [label(k) for k in others if used[k]]
+        if on and clash:
+            raise ValueError(f"함께 쓸 수 없는 옵션입니다: {label(name)} + {', '.join(clash)}")
+    if strict_age and not flow:
+        raise ValueError(f"{label('strict_age')} 옵션은 {label('flow')} 옵션과 함께만 쓸 수 있습니다.")
+
+def run_assignment(leader_file, member_file, output=None, seed=None, weights=None, max_retries=2000,
+                   refine_iterations=0, refine_seconds=0.0, workers=1, most_constrained_first=True,
+                   save=True, quiet=True, cache_dir=None, telemetry=False, time_budget=0.0,
+                   previous=None, formats=None, group_sheets=True, flow=False, strict_age=False, shards=0):
+    """약관 동의/연도 입력 없이 조 배정을 한 번 실행하고 결과를 dict로 돌려줍니다. ('assignments': {참가자 행 번호: 조 번호})
+    옵션은 CLI run 명령과 같으며 (workers=0은 모든 코어), seed를 주지 않으면 새로 뽑아 'seed'에 담습니다."""
+    check_options(previous, flow, shards, time_budget, workers, strict_age)
+    check_parquet_support([leader_file, member_file, previous] + ([output] if save else []), formats if save else ())
+    builder = TeamBuilder()
+    check_weights(weights, builder.weights)
+    builder.weights.update(weights or {})
+    builder.max_retries = max_retries
+    builder.refine_iterations = refine_iterations
+    builder.refine_seconds = refine_seconds
+    builder.workers = workers or os.cpu_count() or 1
+    builder.most_constrained_first = most_constrained_first
+    builder.cache_dir = cache_dir
+    builder.time_budget = time_budget
+    builder.flow = flow
+    builder.seed = seed
+    builder.shards = shards
+    builder.strict_age = strict_age
+    if telemetry:
+        builder.telemetry = Telemetry()
+
+    was_quiet = console.quiet
+    console.quiet = quiet
+    try:
+        if not builder.load_data(leader_file, member_file):
+            result = {'success': False, 'error': 'load_failed', 'load_issues': builder.load_issues}
+            if telemetry: result['telemetry'] = builder.telemetry.to_dict()
+            return result
+        success = builder.assign_incremental(previous) if previous else builder.assign_teams()
+        saved = builder.save_result(output, formats, group_sheets) if success and save else []
+    finally:
+        console.quiet = was_quiet
+
+    result = dict(builder.stats)
+    result.update({
+        'load_issues': builder.load_issues,
+        'assignments': builder.result_groups if success else {},
+        'groups': builder.group_summary() if success else {},
+        'output': saved[0] if saved else None,
+        'outputs': saved,
+    })
+    if telemetry:
+        result['telemetry'] = builder.telemetry.to_dict()
+    return result
+
+def evaluate_result(leader_file, result_file, weights=None, per_group=False, quiet=True):
+    """결과 파일('최종 배정 조' 열이 있는 참가자 표)의 균형 지표를 계산합니다. (evaluate_assignment와 같은 dict)
+    조장 파일은 조 개수와 조장 나이 위반을 세는 데, weights는 균형 점수 계산에 쓰입니다. 읽지 못하면 None입니다."""
+    check_parquet_support([leader_file, result_file])
+    builder = TeamBuilder()
+    check_weights(weights, builder.weights)
+    builder.weights.update(weights or {})
+
+    was_quiet = console.quiet
+    console.quiet = quiet
+    try:
+        if not builder.load_data(leader_file, result_file):
+            return None
+    finally:
+        console.quiet = was_quiet
+
+    df = builder.df_members
+    if '최종 배정 조' not in df.columns:
+        console.print(f"[error]❌ '{result_file}'에 '최종 배정 조' 열이 없습니다.[/error]")
+        return None
+    group_of = dict(zip(df.index, pd.to_numeric(df['최종 배정 조'], errors='coerce').tolist()))
+    assign = np.array([int(g) - 1 if 1 <= g <= builder.num_groups else -1
+                       for g in (group_of[m['original_idx']] for m in builder.members)], dtype=np.int64)
+    engine = ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    return evaluate_assignment(engine, assign, per_group)
+
+def print_metrics_table(results):
+    # {이름: 지표 dict}를 지표별 한 줄로 비교하는 표
+    table = Table(title="📏 [bold]배정 균형 지표[/bold]", border_style="cyan", header_style="bold white on dark_green")
+    table.add_column("지표", style="bold cyan")
+    for name in results:
+        table.add_column(os.path.basename(name), justify="right")
+    for key, label in METRIC_LABELS.items():
+        values = [r[key] for r in results.values()]
+        table.add_row(label, *(f"{v:,.0f}" if key == 'score' else f"{v:.3f}" if isinstance(v, float) else str(v) for v in values))
+    console.print(table)
+
+def print_group_metrics(metrics):
+    table = Table(title="📊 [bold]조별 지표[/bold]", border_style="cyan", header_style="bold white on dark_green")
+    for col in ("조", "인원", "남/여", "성비 편차", "학과 엔트로피", "평균 생년", "생년 분산", "신캠 1명", "신캠 묶음", "나이 위반"):
+        table.add_column(col, justify="center")
+    for g in metrics['groups']:
+        table.add_row(f"새터 {g['group']}조", str(g['size']), f"[cyan]{g['male']}[/cyan] : [magenta]{g['female']}[/magenta]",
+                      f"{g['male_ratio_dev']:+.1%}", f"{g['major_entropy']:.2f}", f"{g['birth_mean']:.1f}",
+                      f"{g['birth_var']:.2f}", str(g['new_cam_singletons']), str(g['new_cam_clusters']),
+                      str(g['age_violations']))
+    console.print(table)
+
+def run_sweep(leader_file, member_file, configs, attempts=20, workers=1, seed=None, most_constrained_first=True,
+              quiet=True, cache_dir=None):
+    """입력을 한 번만 읽고 configs(가중치 dict 목록)마다 attempts번 배정해 균형 지표와 소요 시간을 비교합니다.
+    반환: 조합별 결과 목록 ('pareto': 파레토 최적 여부, 'seed': 다시 돌릴 때 줄 시드 포함), 입력을 읽지 못하면 None"""
+    check_parquet_support([leader_file, member_file])
+    builder = TeamBuilder()
+    builder.cache_dir = cache_dir
+    for weights in configs:
+        check_weights(weights, builder.weights)
+
+    was_quiet = console.quiet
+    console.quiet = quiet
+    try:
+        if not builder.load_data(leader_file, member_file):
+            return None
+        slot_pairs = builder._build_slot_pairs()
+    finally:
+        console.quiet = was_quiet
+    if slot_pairs is None:
+        return None
+
+    engine = ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights,
+                         most_constrained=most_constrained_first)
+    order = sorted(range(len(builder.members)), key=lambda i: builder.members[i]['birth_year'])
+    base_seed = seed if seed is not None else random.SystemRandom().getrandbits(32)  # 전역 random은 건드리지 않음
+    configs = [dict(builder.weights, **w) for w in configs]
+
+    with console.status(f"[bold green]가중치 조합 {len(configs)}개 비교 중...[/bold green]") as status:
+        def on_progress(done):
+            status.update(f"[bold green]가중치 조합 비교 중... ({done}/{len(configs)})[/bold green]")
+        results = sweep_weights(engine, slot_pairs, order, configs, attempts, workers or os.cpu_count() or 1,
+                                base_seed, on_progress)
+
+    front = set(pareto_front(results))
+    for i, r in enumerate(results):
+        r['pareto'] = i in front
+        r['seed'] = base_seed
+    return results
+
+def print_sweep_table(results, keys):
+    # keys: 표에 보여줄 (바뀐) 가중치 항목
+    table = Table(title="⚖️ [bold]가중치 조합 비교[/bold] [dim](★ 파레토 최적)[/dim]", border_style="cyan",
+                  header_style="bold white on dark_green")
+    table.add_column("#", justify="right")
+    for k in keys:
+        table.add_column(k, justify="right", style="cyan")
+    for key, _ in SWEEP_OBJECTIVES:
+        table.add_column(METRIC_LABELS[key], justify="right")
+    table.add_column("성공", justify="center")
+    table.add_column("시간(초)", justify="right")
+
+    order = sorted(range(len(results)), key=lambda i: (not results[i]['pareto'], i))
+    for i in order:
+        r = results[i]
+        m = r['metrics']
+        cells = [f"{m[key]:.3f}" if isinstance(m[key], float) else str(m[key]) for key, _ in SWEEP_OBJECTIVES] if m \
+            else ['-'] * len(SWEEP_OBJECTIVES)
+        table.add_row(f"{'★ ' if r['pareto'] else ''}{i + 1}", *(f"{r['weights'][k]:g}" for k in keys), *cells,
+                      f"{r['feasible']}/{r['attempts']}", f"{r['seconds']:.2f}")
+    console.print(table)
+
+def _weight_key(key):
+    # 가중치 이름 오타는 배정 전에 argparse 오류로 알림 (check_weights와 같은 확인)
+    try:
+        check_weights([key.strip()], TeamBuilder().weights)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return key.strip()
+
+def _parse_weight(text):
+    key, _, value = text.partition('=')
+    key = _weight_key(key)
+    try:
+        return key, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'항목=값' 형식이어야 합니다: {text}")
+
+def _parse_grid(text):
+    # '항목=값1,값2,...'
+    key, _, values = text.partition('=')
+    key = _weight_key(key)
+    try:
+        return key, [float(v) for v in values.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'항목=값1,값2' 형식이어야 합니다: {text}")
+
+def _parse_range(text):
+    # '항목=최소:최대'
+    key, _, values = text.partition('=')
+    key = _weight_key(key)
+    try:
+        lo, hi = (float(v) for v in values.split(':'))
+        return key, (lo, hi)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'항목=최소:최대' 형식이어야 합니다: {text}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py', description='GIST 새내기배움터 조 자동 배정 (인자 없이 실행하면 대화형 모드)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='약관/입력 없이 한 번 배정하고 결과 저장')
+    run.add_argument('--leader', required=True, help='조장 파일 (xlsx/csv/parquet)')
+    run.add_argument('--freshmen', required=True, help='참가자 파일 (xlsx/csv/parquet)')
+    run.add_argument('--output', help='결과 파일 경로 (기본: team_result_날짜_시각.xlsx)')
+    run.add_argument('--format', nargs='+', choices=RESULT_FORMATS, metavar='형식',
+                     help='저장 형식 xlsx/csv/parquet (여러 개 가능, 기본: --output 확장자)')
+    run.add_argument('--no-group-sheets', action='store_true', help='엑셀에 조별 시트를 만들지 않음')
+    run.add_argument('--no-save', action='store_true', help='결과 파일을 쓰지 않음')
+    run.add_argument('--seed', type=int, help='난수 시드 (같은 입력/시드면 같은 결과, 저장된 결과가 있으면 바로 사용)')
+    run.add_argument('--weight', type=_parse_weight, action='append', default=[], metavar='항목=값',
+                     help='가중치 변경 (예: --weight major=60), 여러 번 지정 가능')
+    run.add_argument('--previous', metavar='결과파일',
+                     help='이전 결과(team_result_...xlsx)의 배정을 유지하고 추가/취소된 인원만 반영')
+    run.add_argument('--max-retries', type=int, default=2000, help='최대 시도 횟수 (기본 2000)')
+    run.add_argument('--time-budget', type=float, default=0.0, metavar='초',
+                     help='시도 횟수 대신 이 시간 동안 탐색해 최고 점수 배정 선택 (Ctrl-C로 조기 종료)')
+    run.add_argument('--shards', type=int, default=0, metavar='N',
+                     help='조를 N개 묶음으로 나눠 묶음별로 배정 후 합침 (수백 개 조의 대규모 인원용, --workers와 함께 병렬)')
+    run.add_argument('--flow', action='store_true',
+                     help='재시도 대신 최소 비용 흐름으로 인원표를 정하고 동명이인/신캠조는 교환으로 보정 (휴리스틱)')
+    run.add_argument('--strict-age', action='store_true', help='--flow에서 조장 나이 조건을 못 지키면 증명과 함께 실패')
+    run.add_argument('--refine-iterations', type=int, default=0, help='국소 탐색 교환 시도 횟수')
+    run.add_argument('--refine-seconds', type=float, default=0.0, help='국소 탐색 시간 예산 (초)')
+    run.add_argument('--workers', type=int, default=1, help='병렬 프로세스 수 (0: 모든 코어)')
+    run.add_argument('--birth-order', action='store_true', help='선택지가 적은 순 대신 기존 생년 순으로 배정')
+    run.add_argument('--cache-dir', metavar='폴더',
+                     help='읽은 입력과 배정 결과를 이 폴더에 캐시해 재사용 (예: .st_cache, 개인정보가 저장되므로 주의)')
+    run.add_argument('--json', metavar='PATH', help="결과 요약/배정을 JSON으로 저장 ('-'면 표준 출력)")
+    run.add_argument('--telemetry', metavar='PATH', help="단계별 시간/하드 조건 탈락 횟수를 JSON으로 저장 ('-'면 표준 출력)")
+    run.add_argument('--verbose', action='store_true', help='진행 상황과 결과 표 출력')
+
+    ev = sub.add_parser('evaluate', help='결과 파일의 균형 지표 계산 (여러 파일이면 나란히 비교)')
+    ev.add_argument('--leader', required=True, help='조장 파일 (xlsx/csv/parquet)')
+    ev.add_argument('--result', required=True, nargs='+', help="'최종 배정 조' 열이 있는 결과 파일")
+    ev.add_argument('--weight', type=_parse_weight, action='append', default=[], metavar='항목=값',
+                    help='균형 점수 계산에 쓸 가중치 변경')
+    ev.add_argument('--per-group', action='store_true', help='조별 지표 표도 출력')
+    ev.add_argument('--json', metavar='PATH', help="지표를 JSON으로 저장 ('-'면 표준 출력)")
+
+    sw = sub.add_parser('sweep', help='여러 가중치 조합으로 배정해 균형 지표/시간 비교 (파레토 최적 표시)')
+    sw.add_argument('--leader', required=True, help='조장 파일 (xlsx/csv/parquet)')
+    sw.add_argument('--freshmen', required=True, help='참가자 파일 (xlsx/csv/parquet)')
+    sw.add_argument('--grid', type=_parse_grid, action='append', default=[], metavar='항목=값1,값2',
+                    help='격자 탐색할 가중치 값 (여러 항목이면 모든 조합)')
+    sw.add_argument('--range', type=_parse_range, action='append', default=[], metavar='항목=최소:최대',
+                    help='무작위 탐색 범위 (--samples와 함께, 기본: 모든 항목 기본값의 0.5~2배)')
+    sw.add_argument('--samples', type=int, default=0, help='무작위로 뽑을 가중치 조합 수')
+    sw.add_argument('--attempts', type=int, default=20, help='조합마다 시도 횟수 (기본 20, 그중 최고 점수 배정 평가)')
+    sw.add_argument('--workers', type=int, default=0, help='병렬 프로세스 수 (기본 0: 모든 코어)')
+    sw.add_argument('--seed', type=int, help='난수 시드 (조합 생성과 배정 모두)')
+    sw.add_argument('--cache-dir', metavar='폴더', help='읽은 입력을 이 폴더에 캐시해 재사용 (예: .st_cache)')
+    sw.add_argument('--json', metavar='PATH', help="조합별 결과를 JSON으로 저장 ('-'면 표준 출력)")
+    return parser
+
+def write_json(data, path):
+    text = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+    if path == '-':
+        print(text)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+def main_cli(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        try:
+            check_options(args.previous, args.flow, args.shards, args.time_budget, args.workers, args.strict_age,
+                          label=lambda name: '--' + name.replace('_', '-'))
+        except ValueError as e:
+            parser.error(str(e))
+        result = run_assignment(
+            args.leader, args.freshmen, output=args.output, seed=args.seed, weights=dict(args.weight),
+            max_retries=args.max_retries, refine_iterations=args.refine_iterations,
+            refine_seconds=args.refine_seconds, workers=args.workers, time_budget=args.time_budget,
+            most_constrained_first=not args.birth_order, save=not args.no_save, quiet=not args.verbose,
+            cache_dir=args.cache_dir, telemetry=bool(args.telemetry),
+            previous=args.previous, formats=args.format, group_sheets=not args.no_group_sheets,
+            flow=args.flow, strict_age=args.strict_age, shards=args.shards,
+        )
+        if args.telemetry:
+            write_json(result.pop('telemetry'), args.telemetry)
+        if args.json:
+            write_json(result, args.json)
+        elif not args.verbose and args.telemetry != '-':
+            if result['success']:
+                cached = " (저장된 결과)" if result.get('cached') else ""
+                print(f"성공: 시도 {result['attempts']}회, 균형 점수 {result['score']:,.0f}, 시드 {result['seed']}, "
+                      f"{result['seconds']:.2f}초{cached}" + (f" -> {', '.join(result['outputs'])}" if result['outputs'] else ""))
+            else:
+                flow_info = result.get('flow')
+                print("실패: " + (flow_failure_text(flow_info) if flow_info else result.get('error', '배정 실패')), file=sys.stderr)
+        return 0 if result['success'] else 1
+
+    if args.command == 'sweep':
+        base = TeamBuilder().weights
+        seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)  # 조합 생성과 배정에 같은 시드
+        rng = random.Random(seed)
+        grid, ranges = dict(args.grid), dict(args.range)
+        if not grid and not args.samples:
+            args.samples = 16
+        if args.samples and not ranges:
+            ranges = {k: (v * 0.5, v * 2) for k, v in base.items() if k != 'new_cam_max_penalty'}
+        configs = (weight_grid({}, grid) if grid else []) + weight_samples({}, ranges, args.samples, rng)
+        results = run_sweep(args.leader, args.freshmen, configs, attempts=args.attempts, workers=args.workers,
+                            seed=seed, quiet=True, cache_dir=args.cache_dir)
+        if results is None:
+            print("실패: 입력 파일을 읽지 못했습니다.", file=sys.stderr)
+            return 1
+        if args.json:
+            write_json(results, args.json)
+        if args.json != '-':
+            print_sweep_table(results, [k for k in base if k in grid or k in ranges])
+            console.print(f"[dim]🎲 시드 {seed} (--seed {seed}로 같은 조합과 배정을 다시 만들 수 있습니다)[/dim]")
+        return 0
+
+    if args.command == 'evaluate':
+        results = {}
+        for path in args.result:
+            metrics = evaluate_result(args.leader, path, weights=dict(args.weight), per_group=args.per_group)
+            if metrics is None:
+                print(f"실패: '{path}'을 읽지 못했습니다.", file=sys.stderr)
+                return 1
+            results[path] = metrics
+        if args.json:
+            write_json(results if len(results) > 1 else metrics, args.json)
+        if args.json != '-':
+            print_metrics_table(results)
+            if args.per_group:
+                for path, metrics in results.items():
+                    console.print(f"\n[bold]{path}[/bold]")
+                    print_group_metrics(metrics)
+        return 0
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        try:
+            sys.exit(main_cli(sys.argv[1:]))
+        except ImportError as e:
+            console.print(f"[error]❌ {e}[/error]")
+            sys.exit(1)
+
     builder = TeamBuilder()
     
     # 약관 동의 후 실행
     if builder.agree_to_terms():
         if builder.load_data():
-            builder.assign_teams()
-            builder.save_result()
+            if builder.assign_teams():
+                builder.save_result()
     else:
-        pass
\ No newline at end of file
+        pass
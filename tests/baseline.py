@@ -0,0 +1,76 @@
+"""main.py에서 지운 행 단위 헬퍼의 원본 사본. 열 단위 파서와 ScoreEngine이 같은 값을 내는지 비교하는 기준입니다."""
+
+
+def smart_get_year(value):
+    try:
+        if hasattr(value, 'year'): return value.year
+        val_str = str(value).strip()
+        if not val_str or val_str.lower() == 'nan': return 0
+        if len(val_str) == 4 and val_str.isdigit(): return int(val_str)
+        if '-' in val_str or len(val_str) == 6:
+            if '-' in val_str: prefix = val_str.split('-')[0]
+            else: prefix = val_str[:6]
+            yy = int(prefix[:2])
+            if 0 <= yy <= 30: return 2000 + yy
+            else: return 1900 + yy
+        return int(float(val_str))
+    except: return 0
+
+
+def get_name_key(name):
+    name = str(name).strip()
+    if len(name) > 1: return name[1:]
+    return name
+
+
+def calculate_score(group_id, member, group_status, constraints, weights, ignore_age=False, limits_config=None):
+    leader_min_year = constraints['leader_years'].get(group_id, 0)
+
+    # 0. 정밀한 인원/성비 제한 체크 (limits_config 사용)
+    if limits_config:
+        # 1) 총원 체크
+        if group_status[group_id]['count'] >= limits_config['total']:
+            return -float('inf')
+
+        # 2) 성별 체크
+        my_gender = member['gender']
+        current_gender_cnt = group_status[group_id]['genders'].get(my_gender, 0)
+
+        if my_gender == '남':
+            if current_gender_cnt >= limits_config['male']: return -float('inf')
+        elif my_gender == '여':
+            if current_gender_cnt >= limits_config['female']: return -float('inf')
+
+    # 1. 조장 나이 제한
+    if not ignore_age:
+        if leader_min_year > 0 and member['birth_year'] < leader_min_year:
+            return -float('inf')
+
+    # 2. 동명이인 제한
+    if member['name_key'] in group_status[group_id]['names']:
+        return -float('inf')
+
+    # 3. 신캠조 인원 제한
+    nc_count = group_status[group_id]['new_cam'].get(member['new_cam'], 0)
+    if nc_count >= 3:
+        return -float('inf')
+
+    # 4. 점수 계산
+    score = 0
+    current_size = group_status[group_id]['count']
+    score -= current_size * weights['size']
+
+    gender_count = group_status[group_id]['genders'].get(member['gender'], 0)
+    score -= gender_count * weights['gender']
+
+    major_count = group_status[group_id]['majors'].get(member['major'], 0)
+    score -= major_count * weights['major']
+
+    by_count = group_status[group_id]['birth_years'].get(member['birth_year'], 0)
+    score -= by_count * weights['birth_year']
+
+    if nc_count == 1: score += weights['new_cam_cluster_bonus']
+    elif nc_count > 0: score += weights['new_cam_exist_bonus']
+    else: score -= weights['new_cam_scatter_penalty']
+
+    return score
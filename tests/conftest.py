@@ -0,0 +1,111 @@
+import os
+import sys
+import random
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+main.console.quiet = True  # 테스트 출력에 표/진행 표시가 섞이지 않도록
+
+SURNAMES = '김이박최정강조윤장임한오서신권'
+SYLLABLES = '민서지하도예수윤준우현유진시은주원채연승태경소다나영'
+COMMON_GIVEN = ['민준', '서연', '지훈', '서윤', '도윤', '지우', '하준', '하은', '시우', '지민']
+
+
+def make_cohort(members=120, groups=6, year=2026, seed=0, leader_ages=(20, 23), older_ratio=0.3,
+                name_clash=0.15, male_ratio=0.6):
+    """테스트용 가상 새터 (조장 DataFrame, 참가자 DataFrame). 고정 시드 결과를 비교하므로 생성 규칙은 바꾸지 않습니다."""
+    rng = random.Random(seed)
+    leaders = pd.DataFrame([
+        {'조 번호': g, '조장1 이름': rng.choice(SURNAMES) + rng.choice(COMMON_GIVEN),
+         '조장1의 생년': year - rng.randint(*leader_ages),
+         '조장2 이름': rng.choice(SURNAMES) + rng.choice(COMMON_GIVEN),
+         '조장2의 생년': year - rng.randint(*leader_ages)}
+        for g in range(1, groups + 1)])
+
+    given = [a + b for a in SYLLABLES for b in SYLLABLES if a != b and a + b not in COMMON_GIVEN]
+    rng.shuffle(given)
+    rows, clashes = [], 0
+    for i in range(members):
+        if rng.random() < name_clash:  # 흔한 이름을 돌아가며 써서 같은 이름이 조 수보다 많아지지 않게
+            name, clashes = COMMON_GIVEN[clashes % len(COMMON_GIVEN)], clashes + 1
+        else:
+            name = given[i]
+        birth = year - 19 - (min(rng.randint(1, 4), rng.randint(1, 4)) if rng.random() < older_ratio else 0)
+        male = rng.random() < male_ratio
+        digit = (3 if birth >= 2000 else 1) + (not male)
+        rows.append({
+            '성명': rng.choice(SURNAMES) + name,
+            '출신고교명': f"지스트고{rng.randint(1, 50)}",
+            '신캠조': rng.randint(1, max(1, members // groups)),  # 신캠조 하나가 조마다 평균 1명
+            '학과/학부': '반도체공학과' if rng.random() < 0.15 else '도전탐색과정',
+            '성별': '남자' if male else '여자',
+            '전화번호': f"010{rng.randrange(10 ** 8):08d}",
+            '주민등록번호': f"{birth % 100:02d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}-{digit}000000",
+        })
+    return leaders, pd.DataFrame(rows)
+
+
+def write_cohort(leaders, freshmen, out_dir, year=2026):
+    # main.py가 찾는 이름('연도ST_leader.xlsx' 등)으로 저장
+    paths = []
+    for stem, df in ((f"{year}ST_leader", leaders), (f"{year}ST_freshmen", freshmen)):
+        path = os.path.join(str(out_dir), f"{stem}.xlsx")
+        df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def member(name, gender='남', new_cam=1, birth_year=2007, major='도전탐색과정'):
+    # ScoreEngine에 바로 넣을 수 있는 최소한의 멤버 dict
+    return {'name': name, 'name_key': name[1:], 'gender': gender, 'new_cam': new_cam,
+            'birth_year': birth_year, 'major': major}
+
+
+def check_hard_rules(members, assign, male_limit=None, female_limit=None):
+    """members(행 dict)와 assign(멤버별 0부터의 조 번호)이 하드 조건을 모두 지키는지 엔진 카운터 없이 직접 셉니다.
+    남/여 한도를 주면 조마다 그 인원과 같아야 하고, 없으면 남/여 인원 편차가 1 이내면 됩니다."""
+    G = max(assign) + 1 if male_limit is None else len(male_limit)
+    groups = [[] for _ in range(G)]
+    for i, g in enumerate(assign):
+        assert 0 <= g < G, f"{members[i]['name']} 미배정"
+        groups[g].append(members[i])
+
+    sizes = [len(ms) for ms in groups]
+    assert max(sizes) - min(sizes) <= 1
+    males = [sum(m['gender'] == '남' for m in ms) for ms in groups]
+    females = [len(ms) - k for ms, k in zip(groups, males)]
+    if male_limit is None:
+        assert max(males) - min(males) <= 1 and max(females) - min(females) <= 1
+    else:
+        assert males == list(male_limit) and females == list(female_limit)
+    for g, ms in enumerate(groups):
+        keys = [m['name_key'] for m in ms]
+        assert len(keys) == len(set(keys)), f"{g + 1}조 동명이인"
+        for cam in {m['new_cam'] for m in ms}:
+            assert sum(m['new_cam'] == cam for m in ms) <= 3, f"{g + 1}조 신캠조 {cam} 4명 이상"
+
+
+def load_builder(leader_file, member_file):
+    builder = main.TeamBuilder()
+    assert builder.load_data(leader_file, member_file)
+    return builder
+
+
+@pytest.fixture(scope='session')
+def cohort(tmp_path_factory):
+    """300명 / 10조 가상 새터 (동명이인 후보가 많게). 반환: (조장 파일, 참가자 파일, 참가자 DataFrame)"""
+    leaders, freshmen = make_cohort(members=300, groups=10, seed=1, name_clash=0.2)
+    leader_file, member_file = write_cohort(leaders, freshmen, tmp_path_factory.mktemp('cohort'))
+    return leader_file, member_file, freshmen
+
+
+@pytest.fixture(scope='session')
+def tight_cohort(tmp_path_factory):
+    """조장이 어려 조장 나이 위반을 피할 수 없는 가상 새터. 반환: (조장 파일, 참가자 파일)"""
+    leaders, freshmen = make_cohort(members=400, groups=20, seed=2, leader_ages=(20, 21), older_ratio=0.5)
+    return write_cohort(leaders, freshmen, tmp_path_factory.mktemp('tight'))
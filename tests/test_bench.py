@@ -0,0 +1,21 @@
+import bench
+
+
+def test_generate_cohort_follows_the_scenario():
+    sc = bench.Scenario(members=500, groups=25, male_ratio=0.7, new_cam_size=25, name_clash=0.0, seed=4)
+    leaders, freshmen = bench.generate_cohort(sc)
+    assert len(leaders) == 25 and len(freshmen) == 500
+    assert freshmen['신캠조'].max() <= 20
+    assert abs((freshmen['성별'] == '남자').mean() - 0.7) < 0.08
+    assert freshmen['성명'].str[1:].is_unique  # 동명이인 비율 0이면 이름 키가 겹치지 않음
+
+    again = bench.generate_cohort(sc)
+    assert leaders.equals(again[0]) and freshmen.equals(again[1])
+
+
+def test_run_scenario_reports_balanced_runs():
+    summary = bench.run_scenario(bench.Scenario(members=120, groups=6, new_cam_size=8), repeats=2)
+    assert summary['success_rate'] == 1.0
+    for run in summary['runs']:
+        assert run['size_spread'] <= 1 and run['male_spread'] <= 1 and run['female_spread'] <= 1
+        assert run['name_clashes'] == 0 and run['unplaced'] == 0
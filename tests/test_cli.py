@@ -0,0 +1,87 @@
+import json
+import os
+import random
+
+import pandas as pd
+import pytest
+
+import main
+
+
+def test_run_assignment_is_reproducible_by_seed(cohort):
+    runs = [main.run_assignment(*cohort[:2], seed=5, save=False, cache_dir=None) for _ in range(2)]
+    assert runs[0]['success'] and runs[0]['assignments'] == runs[1]['assignments']
+    assert sum(g['count'] for g in runs[0]['groups'].values()) == len(cohort[2])
+
+
+def test_run_assignment_rejects_unknown_weights(cohort):
+    with pytest.raises(ValueError, match='majr'):
+        main.run_assignment(*cohort[:2], seed=0, save=False, cache_dir=None, weights={'majr': 60})
+
+
+def test_run_command_writes_result_and_json(cohort, tmp_path):
+    output, summary = str(tmp_path / 'result.xlsx'), str(tmp_path / 'result.json')
+    code = main.main_cli(['run', '--leader', cohort[0], '--freshmen', cohort[1], '--seed', '3',
+                          '--weight', 'major=60', '--output', output, '--json', summary])
+    assert code == 0 and os.path.exists(output)
+
+    with open(summary, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['success'] and data['output'] == output
+    saved = pd.read_excel(output)  # 조/이름 순으로 정렬되어 저장됨
+    expected = [(name, data['assignments'][str(i)]) for i, name in enumerate(cohort[2]['성명'])]
+    assert sorted(zip(saved['성명'], saved['최종 배정 조'])) == sorted(expected)
+
+
+def test_unseeded_run_records_a_replayable_seed_and_leaves_global_random_alone(cohort):
+    state = random.getstate()
+    first = main.run_assignment(*cohort[:2], save=False, cache_dir=None)
+    assert random.getstate() == state
+    replay = main.run_assignment(*cohort[:2], seed=first['seed'], save=False, cache_dir=None)
+    assert replay['assignments'] == first['assignments']
+
+
+def test_result_cache_replays_identical_runs_only(cohort, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    run = lambda **options: main.run_assignment(*cohort[:2], seed=8, save=False, cache_dir=cache_dir, **options)
+    first, again, other = run(), run(), run(weights={'major': 70})
+    assert not first.get('cached') and again['cached'] and not other.get('cached')
+    assert again['assignments'] == first['assignments'] and again['metrics'] == first['metrics']
+
+
+def test_result_cache_is_opt_in_and_prunes_stale_entries(cohort, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.run_assignment(*cohort[:2], seed=8, save=False)
+    assert not os.listdir(tmp_path)  # cache_dir을 주지 않으면 아무것도 쓰지 않음
+
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(main, 'RESULT_CACHE_KEEP', 2)
+    for seed in range(3):
+        main.run_assignment(*cohort[:2], seed=seed, save=False, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob('*-result-*.pkl'))) == 2
+
+    # 참가자 파일 내용이 바뀌면 예전 내용의 결과는 지워짐
+    roster = tmp_path / os.path.basename(cohort[1])
+    cohort[2].iloc[:-1].to_excel(roster, index=False)
+    main.run_assignment(cohort[0], str(roster), seed=0, save=False, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob('*-result-*.pkl'))) == 1
+
+
+@pytest.mark.parametrize('options, names', [
+    ({'previous': 'result.xlsx', 'workers': 2}, ['previous', 'workers']),
+    ({'previous': 'result.xlsx', 'flow': True, 'time_budget': 5}, ['previous', 'flow', 'time_budget']),
+    ({'flow': True, 'shards': 4}, ['flow', 'shards']),
+    ({'shards': 4, 'time_budget': 5}, ['shards', 'time_budget']),
+    ({'strict_age': True}, ['strict_age']),
+])
+def test_incompatible_options_are_rejected(cohort, options, names):
+    with pytest.raises(ValueError) as error:
+        main.run_assignment(*cohort[:2], seed=0, save=False, **options)
+    assert all(name in str(error.value) for name in names)
+
+
+def test_run_command_reports_incompatible_options(cohort, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main.main_cli(['run', '--leader', cohort[0], '--freshmen', cohort[1], '--flow', '--time-budget', '5'])
+    assert exit_info.value.code == 2
+    assert '--flow + --time-budget' in capsys.readouterr().err
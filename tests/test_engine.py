@@ -0,0 +1,121 @@
+import hashlib
+import random
+
+import numpy as np
+import pytest
+
+import baseline
+import main
+from conftest import check_hard_rules, load_builder, member
+
+WEIGHTS = main.TeamBuilder().weights
+
+# cohort를 시드 0~2로 배정한 결과의 지문. 생년 순 배정(BIRTH_ORDER)은 슬롯을 (남, 여) 짝으로 섞으면서,
+# 기본값(선택지 적은 멤버부터)은 배정 순서가 바뀌면서 정해진 값
+GOLDEN = ['3c027c0de012', 'a2a41e2da3bd', 'd18b21630942']
+GOLDEN_BIRTH_ORDER = ['c16128f6ab44', 'fccfd087244e', 'b26d5ae3b774']
+
+
+def digest(assignments):
+    return hashlib.sha1(','.join(str(assignments[k]) for k in sorted(assignments)).encode()).hexdigest()[:12]
+
+
+def test_scores_block_name_clash():
+    members = [member('김민준'), member('이민준'), member('박서연')]
+    engine = main.ScoreEngine(members, 2, {}, WEIGHTS)
+    engine.reset([3, 3], [0, 0])
+    engine.place(0, 0)
+    assert engine.scores(1)[0] == -np.inf  # 성을 뗀 이름이 같으면 같은 조 불가
+    assert engine.scores(1)[1] > -np.inf
+    assert engine.scores(2)[0] > -np.inf
+
+
+def test_scores_block_fourth_new_cam_member():
+    members = [member(f'김{k}호', new_cam=7) for k in range(5)]
+    engine = main.ScoreEngine(members, 2, {}, WEIGHTS)
+    engine.reset([5, 5], [0, 0])
+    for i in range(3):
+        engine.place(i, 0)
+    assert engine.scores(3)[0] == -np.inf
+    assert engine.scores(3)[1] > -np.inf
+
+
+def test_scores_block_full_gender_slot():
+    members = [member('김가나', gender='여'), member('이다라', gender='여'), member('박마바')]
+    engine = main.ScoreEngine(members, 2, {}, WEIGHTS)
+    engine.reset([1, 1], [1, 1])
+    engine.place(0, 0)
+    assert engine.scores(1)[0] == -np.inf  # 여자 자리 1개가 이미 참
+    assert engine.scores(2)[0] > -np.inf   # 남자 자리는 남아 있음
+
+
+def test_scores_respect_leader_age_unless_relaxed():
+    members = [member('김가나', birth_year=2000)]
+    engine = main.ScoreEngine(members, 2, {1: 2003, 2: 1999}, WEIGHTS)
+    engine.reset([1, 1], [0, 0])
+    assert engine.scores(0)[0] == -np.inf
+    assert engine.scores(0)[1] > -np.inf
+    assert engine.scores(0, ignore_age=True)[0] > -np.inf
+
+
+def test_eligible_index_matches_leader_years():
+    leaders = {1: 2003, 2: 0, 3: 2005, 4: 2001, 5: 2005}  # 0: 조장 생년 미상 (제한 없음)
+    members = [member(f'김{k}호', birth_year=y) for k, y in enumerate((2000, 2001, 2003, 2004, 2005, 2007))]
+    engine = main.ScoreEngine(members, 5, leaders, WEIGHTS)
+    for m, b in zip(members, engine.birth):
+        expected = [leaders[g] == 0 or m['birth_year'] >= leaders[g] for g in range(1, 6)]
+        assert engine.eligible[b].tolist() == expected
+
+
+@pytest.mark.parametrize('ignore_age', [False, True])
+def test_scores_match_calculate_score(cohort, ignore_age):
+    # 무작위로 채워 가며 매 단계 엔진 점수와 원본 calculate_score(조별 dict 상태)를 비교
+    builder = load_builder(*cohort[:2])
+    members, G = builder.members, builder.num_groups
+    male_slots, female_slots = [18] * G, [12] * G
+    engine = main.ScoreEngine(members, G, builder.leaders, builder.weights)
+    engine.reset(male_slots, female_slots)
+    status = {g: {'count': 0, 'names': [], 'genders': {}, 'majors': {}, 'birth_years': {}, 'new_cam': {}}
+              for g in range(1, G + 1)}
+
+    rng = random.Random(0)
+    order = list(range(len(members)))
+    rng.shuffle(order)
+    for i in order:
+        m = members[i]
+        expected = [baseline.calculate_score(g, m, status, {'leader_years': builder.leaders}, builder.weights,
+                                         ignore_age=ignore_age,
+                                         limits_config={'total': male_slots[g - 1] + female_slots[g - 1],
+                                                        'male': male_slots[g - 1], 'female': female_slots[g - 1]})
+                    for g in range(1, G + 1)]
+        assert engine.scores(i, ignore_age).tolist() == expected
+
+        open_groups = [g for g in range(G) if expected[g] > -np.inf]
+        if not open_groups: continue
+        g = rng.choice(open_groups)
+        engine.place(i, g)
+        st = status[g + 1]
+        st['count'] += 1
+        st['names'].append(m['name_key'])
+        for key, value in (('genders', m['gender']), ('majors', m['major']),
+                           ('birth_years', m['birth_year']), ('new_cam', m['new_cam'])):
+            st[key][value] = st[key].get(value, 0) + 1
+
+
+def run(cohort, seed, **options):
+    result = main.run_assignment(*cohort[:2], seed=seed, save=False, cache_dir=None, **options)
+    assert result['success']
+    return result['assignments']
+
+
+def test_seeded_assignment_is_golden(cohort):
+    assert [digest(run(cohort, seed)) for seed in range(3)] == GOLDEN
+    assert [digest(run(cohort, seed, most_constrained_first=False)) for seed in range(3)] == GOLDEN_BIRTH_ORDER
+
+
+@pytest.mark.parametrize('most_constrained', [True, False])
+def test_greedy_assignment_keeps_hard_rules(cohort, most_constrained):
+    builder = load_builder(*cohort[:2])
+    for seed in range(3):
+        result = run(cohort, seed, most_constrained_first=most_constrained)
+        check_hard_rules(builder.members, [result[m['original_idx']] - 1 for m in builder.members])
@@ -0,0 +1,74 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+
+def test_xlsx_writer_writes_frames_and_rows(tmp_path):
+    path = str(tmp_path / 'out.xlsx')
+    frame = pd.DataFrame({'성명': ['김가나', '이다라'], '조': [1, 2], '점수': [0.5, 1.25]})
+    main.write_xlsx_streaming(path, [('명단', frame), ('빈 표', frame.iloc[:0]), ('요약', [['항목', '값'], ['인원', 2]])])
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ['명단', '빈 표', '요약']
+    assert sheets['명단'].equals(frame)
+    assert list(sheets['빈 표'].columns) == ['성명', '조', '점수']
+    assert sheets['요약'].values.tolist() == [['인원', 2]]
+
+
+def test_xlsx_writer_handles_empty_columns(tmp_path):
+    path = str(tmp_path / 'out.xlsx')
+    frame = pd.DataFrame({'성명': ['김가나', '이다라'], '비고': [np.nan, np.nan], '메모': ['있음', None]})
+    main.write_xlsx_streaming(path, [('명단', frame), ('빈 표', frame.iloc[:0])])
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert sheets['명단']['성명'].tolist() == ['김가나', '이다라']
+    assert sheets['명단']['비고'].isna().all()
+    assert sheets['명단']['메모'].tolist()[0] == '있음'
+    assert list(sheets['빈 표'].columns) == ['성명', '비고', '메모']
+
+
+def test_result_export_has_master_summary_and_group_sheets(cohort, tmp_path):
+    output = str(tmp_path / 'result.xlsx')
+    result = main.run_assignment(*cohort[:2], output=output, seed=1, cache_dir=None, formats=['xlsx', 'csv'])
+    assert result['success']
+    assert result['outputs'] == [output, str(tmp_path / 'result.csv')]
+
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert list(sheets)[:2] == ['전체 명단', '요약']
+    assert [name for name in sheets if name.endswith('조')] == [f'{g}조' for g in range(1, 11)]
+    master = sheets['전체 명단']
+    assert len(master) == len(cohort[2])
+    assert sum(len(sheets[f'{g}조']) for g in range(1, 11)) == len(cohort[2])
+    assert (master['최종 배정 조'].value_counts().sort_index().tolist()
+            == [result['groups'][g]['count'] for g in range(1, 11)])
+    assert len(pd.read_csv(str(tmp_path / 'result.csv'), encoding='utf-8-sig')) == len(cohort[2])
+
+
+def test_result_export_with_blank_optional_column(cohort, tmp_path):
+    leader_file, _, freshmen = cohort
+    roster = freshmen.assign(비고=None)
+    roster.loc[0, '비고'] = '늦게 합류'  # 한 조에만 값이 있는 열 (조별 시트에서는 나머지가 모두 빈 열)
+    member_file = str(tmp_path / '2026ST_freshmen.csv')
+    roster.to_csv(member_file, index=False, encoding='utf-8-sig')
+
+    result = main.run_assignment(leader_file, member_file, output=str(tmp_path / 'result.xlsx'), seed=1, cache_dir=None)
+    assert result['success']
+    sheets = pd.read_excel(str(tmp_path / 'result.xlsx'), sheet_name=None)
+    assert len(sheets['전체 명단']) == len(roster)
+    assert sum(len(sheets[f'{g}조']) for g in range(1, 11)) == len(roster)
+
+
+@pytest.mark.parametrize('options', [{'formats': ['xlsx', 'csv', 'parquet']}, {'output_name': 'result.parquet'},
+                                     {'member_file': 'roster.parquet'}])
+def test_missing_pyarrow_fails_before_assignment(cohort, tmp_path, monkeypatch, options):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)  # import pyarrow가 ImportError를 내도록
+    monkeypatch.setattr(main.TeamBuilder, 'load_data', lambda *args: pytest.fail('입력을 읽기 전에 멈춰야 함'))
+    output = str(tmp_path / options.get('output_name', 'result.xlsx'))
+    member_file = str(tmp_path / options['member_file']) if 'member_file' in options else cohort[1]
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        main.run_assignment(cohort[0], member_file, output=output, seed=1, formats=options.get('formats'))
+    assert not list(tmp_path.iterdir())
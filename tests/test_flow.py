@@ -0,0 +1,34 @@
+import main
+from conftest import check_hard_rules, load_builder
+
+
+def test_flow_reaches_its_age_violation_lower_bound(tight_cohort):
+    result = main.run_assignment(*tight_cohort, seed=0, save=False, cache_dir=None, flow=True)
+    assert result['success']
+    info = result['flow']
+    assert info['min_age_violations'] > 0
+    assert info['age_violations'] == info['min_age_violations']
+
+    # 재시도 배정도 이 하한보다 적게 위반할 수는 없음
+    greedy = main.run_assignment(*tight_cohort, seed=0, save=False, cache_dir=None)
+    assert greedy['metrics']['age_violations'] >= info['min_age_violations']
+
+    builder = load_builder(*tight_cohort)
+    check_hard_rules(builder.members, [result['assignments'][m['original_idx']] - 1 for m in builder.members])
+
+
+def test_strict_age_fails_with_a_proof(tight_cohort):
+    result = main.run_assignment(*tight_cohort, seed=0, save=False, cache_dir=None, flow=True, strict_age=True)
+    assert not result['success']
+    assert '조장' in result['flow']['proof']
+    assert main.flow_failure_text(result['flow']).startswith('가능한 배정이 없습니다')
+
+
+def test_unresolved_members_are_reported_without_a_proof(cohort, monkeypatch):
+    monkeypatch.setattr(main, 'swap_into', lambda *args: -1)
+    result = main.run_assignment(*cohort[:2], seed=0, save=False, cache_dir=None, flow=True)
+    info = result['flow']
+    assert not result['success']
+    assert info['proof'] is None and info['unresolved']
+    text = main.flow_failure_text(info)
+    assert info['unresolved'][0] in text and '증명은 아니' in text
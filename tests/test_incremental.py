@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+import main
+from conftest import check_hard_rules, load_builder, make_cohort
+
+
+def excess(kept_male, kept_female, male_slots, female_slots):
+    return (sum(max(0, k - s) for k, s in zip(kept_male, male_slots))
+            + sum(max(0, k - s) for k, s in zip(kept_female, female_slots)))
+
+
+def test_fit_slots_finds_zero_move_fit():
+    # 정렬 순서대로 나누면 (33, 18) 짝이 모두 (33, 17) 조에 가서 7명을 옮겨야 하던 예
+    slot_pairs = [(33, 17)] * 26 + [(33, 18)] * 10 + [(32, 18)] * 24
+    kept_male, kept_female = [33] * 29 + [32] * 31, [17] * 29 + [18] * 31
+    male_slots, female_slots = main.fit_slots_to_groups(slot_pairs, kept_male, kept_female)
+    assert sorted(zip(male_slots, female_slots)) == sorted(slot_pairs)
+    assert excess(kept_male, kept_female, male_slots, female_slots) == 0
+
+
+@pytest.fixture(scope='module')
+def published(cohort, tmp_path_factory):
+    out = str(tmp_path_factory.mktemp('published') / 'result.xlsx')
+    result = main.run_assignment(*cohort[:2], output=out, seed=7, cache_dir=None)
+    assert result['success']
+    return out
+
+
+def rerun(cohort, published, tmp_path, drop, add, seed):
+    # 발표된 명단에서 drop명 빼고 add명 더한 새 명단으로 증분 배정
+    freshmen = cohort[2]
+    extra = make_cohort(members=20, groups=10, seed=99, name_clash=0.0)[1]
+    roster = pd.concat([freshmen.drop(index=freshmen.index[::29][:drop]), extra.iloc[:add]], ignore_index=True)
+    member_file = str(tmp_path / '2026ST_freshmen.csv')
+    roster.to_csv(member_file, index=False, encoding='utf-8-sig')
+    result = main.run_assignment(cohort[0], member_file, previous=published, seed=seed, save=False, cache_dir=None)
+    return roster, member_file, result
+
+
+def check_incremental(cohort, published, roster, member_file, result, drop, add):
+    assert result['success']
+    assert result['added'] == add and result['removed'] == drop
+
+    before = pd.read_excel(published)
+    before_group = dict(zip(main.member_keys(before), before['최종 배정 조']))
+    kept = [(before_group[k], result['assignments'][i]) for k, i in zip(main.member_keys(roster), roster.index)
+            if k in before_group]
+    assert len(kept) == len(roster) - add
+    assert sum(a != b for a, b in kept) == result['moved']
+
+    builder = load_builder(cohort[0], member_file)
+    check_hard_rules(builder.members, [result['assignments'][m['original_idx']] - 1 for m in builder.members])
+
+
+def test_unchanged_roster_keeps_every_group(cohort, published, tmp_path):
+    roster, member_file, result = rerun(cohort, published, tmp_path, 0, 0, seed=0)
+    check_incremental(cohort, published, roster, member_file, result, 0, 0)
+    assert result['moved'] == 0
+
+
+@pytest.mark.parametrize('drop, add', [(0, 3), (3, 3), (5, 0), (10, 10), (0, 10), (10, 0)])
+def test_small_roster_changes_keep_published_groups(cohort, published, tmp_path, drop, add):
+    for seed in range(3):
+        roster, member_file, result = rerun(cohort, published, tmp_path, drop, add, seed)
+        check_incremental(cohort, published, roster, member_file, result, drop, add)
+        assert result['moved'] <= 5
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import baseline
+import main
+from conftest import load_builder
+
+
+@pytest.mark.parametrize('value, year', [
+    (2005, 2005), (2005.0, 2005), ('2005', 2005), ('050302', 2005), (50302, 2005),
+    ('050302-3012345', 2005), ('990101-1012345', 1999), ('0503023012345', 2005),
+    (20050302, 2005), ('2005-03-02', 2005), ('2005/03/02', 2005), ('2005.03.02', 2005),
+    ('05-03-02', 2005), ('05-12-02', 2005), ('99-12-31', 1999), ('05.03.02', 2005), ('05/03/02', 2005),
+    (datetime(2005, 3, 2), 2005),
+])
+def test_parse_birth_years(value, year):
+    years, failed = main.parse_birth_years(pd.Series([value], dtype=object))
+    assert years.tolist() == [year] and not failed.any()
+
+
+@pytest.mark.parametrize('value, is_failure', [('', False), (None, False), ('nan', False), ('모름', True), ('12', True), ('05-3', True)])
+def test_parse_birth_years_blank_and_garbage(value, is_failure):
+    years, failed = main.parse_birth_years(pd.Series([value], dtype=object))
+    assert years.tolist() == [0] and failed.tolist() == [is_failure]
+
+
+def test_parse_birth_years_datetime_column():
+    years, failed = main.parse_birth_years(pd.Series(pd.to_datetime(['2005-03-02', None, '1999-12-31'])))
+    assert years.tolist() == [2005, 0, 1999] and not failed.any()
+
+
+def test_members_match_row_by_row_helpers(cohort):
+    builder = load_builder(*cohort[:2])
+    freshmen = cohort[2]
+    assert [m['original_idx'] for m in builder.members] == list(freshmen.index)
+    for m, (_, row) in zip(builder.members, freshmen.iterrows()):
+        assert m['name_key'] == baseline.get_name_key(row['성명'])
+        assert m['birth_year'] == baseline.smart_get_year(row['주민등록번호'])
+        assert m['gender'] == main.normalize_gender(row['성별'])
+        assert m['new_cam'] == int(row['신캠조'])
+
+
+@pytest.mark.parametrize('encoding', ['utf-8-sig', 'cp949'])
+def test_csv_members_match_xlsx(cohort, tmp_path, encoding):
+    member_file = str(tmp_path / '2026ST_freshmen.csv')
+    cohort[2].to_csv(member_file, index=False, encoding=encoding)
+    fields = ('original_idx', 'name', 'name_key', 'birth_year', 'gender', 'major', 'new_cam')
+    rows = lambda builder: [tuple(m[k] for k in fields) for m in builder.members]
+    assert rows(load_builder(cohort[0], member_file)) == rows(load_builder(*cohort[:2]))
+
+
+def test_cache_reuses_parsed_members_until_the_file_changes(cohort, tmp_path, monkeypatch):
+    member_file = str(tmp_path / '2026ST_freshmen.csv')
+    cohort[2].to_csv(member_file, index=False, encoding='utf-8-sig')
+    cache_dir = tmp_path / 'cache'
+
+    def load():
+        builder = main.TeamBuilder()
+        builder.cache_dir = str(cache_dir)
+        assert builder.load_data(cohort[0], member_file)
+        return builder
+
+    first = load()
+    with monkeypatch.context() as m:
+        m.setattr(main.TeamBuilder, '_parse_members', lambda *args: pytest.fail("캐시를 쓰지 않음"))
+        assert load().members == first.members
+
+    cohort[2].iloc[:-1].to_csv(member_file, index=False, encoding='utf-8-sig')
+    assert len(load().members) == len(first.members) - 1
+    assert len(list(cache_dir.glob('2026ST_freshmen.csv-freshmen-*.pkl'))) == 1  # 예전 캐시는 지워짐
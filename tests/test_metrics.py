@@ -0,0 +1,69 @@
+import math
+
+import pandas as pd
+import pytest
+
+import main
+from conftest import load_builder
+
+
+@pytest.fixture(scope='module')
+def saved(cohort, tmp_path_factory):
+    out = str(tmp_path_factory.mktemp('metrics') / 'result.xlsx')
+    result = main.run_assignment(*cohort[:2], output=out, seed=4, cache_dir=None)
+    assert result['success']
+    return result, out
+
+
+def test_metrics_match_a_direct_count(cohort, saved):
+    result, _ = saved
+    builder = load_builder(*cohort[:2])
+    df = pd.DataFrame(builder.members)
+    df['group'] = df['original_idx'].map(result['assignments'])
+    df['leader'] = df['group'].map(builder.leaders)
+    per_group = df.groupby('group')
+    spread = lambda s: int(s.max() - s.min())
+
+    entropy = per_group['major'].apply(lambda s: -sum(p * math.log2(p) for p in s.value_counts(normalize=True)))
+    cams = df.groupby(['group', 'new_cam']).size()
+    metrics = result['metrics']
+    assert metrics['size_spread'] == spread(per_group.size())
+    assert metrics['male_spread'] == spread(per_group['gender'].apply(lambda s: (s == '남').sum()))
+    assert metrics['major_entropy_min'] == pytest.approx(entropy.min())
+    assert metrics['new_cam_singletons'] == (cams == 1).sum() and metrics['new_cam_clusters'] == (cams >= 2).sum()
+    assert metrics['age_violations'] == (df['birth_year'] < df['leader']).sum()
+    assert metrics['name_clashes'] == df.duplicated(['group', 'name_key']).sum() == 0
+    assert metrics['birth_var_mean'] == pytest.approx(per_group['birth_year'].var(ddof=0).mean())
+    assert metrics['score'] == result['score']
+
+
+def test_live_counters_and_assignment_array_agree(cohort, saved):
+    result, _ = saved
+    builder = load_builder(*cohort[:2])
+    engine = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    assign = [result['assignments'][m['original_idx']] - 1 for m in builder.members]
+    from_array = main.evaluate_assignment(engine, assign, per_group=True)
+
+    males = [from_array['groups'][g]['male'] for g in range(builder.num_groups)]
+    females = [from_array['groups'][g]['female'] for g in range(builder.num_groups)]
+    engine.load(assign, males, females)
+    assert main.evaluate_assignment(engine, per_group=True) == from_array
+
+
+def test_evaluate_reads_a_saved_result(cohort, saved):
+    result, out = saved
+    assert main.evaluate_result(cohort[0], out) == result['metrics']
+
+
+def test_evaluate_rejects_unknown_weights(cohort, saved):
+    with pytest.raises(ValueError, match='majr'):
+        main.evaluate_result(cohort[0], saved[1], weights={'majr': 60})
+
+
+@pytest.mark.parametrize('command', [['run', '--freshmen', 'x.xlsx', '--weight', 'majr=60'],
+                                     ['evaluate', '--result', 'x.xlsx', '--weight', 'majr=60'],
+                                     ['sweep', '--freshmen', 'x.xlsx', '--grid', 'majr=20,40']])
+def test_cli_rejects_unknown_weights(command, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main.main_cli(command[:1] + ['--leader', 'l.xlsx'] + command[1:])
+    assert exit_info.value.code == 2 and 'majr' in capsys.readouterr().err
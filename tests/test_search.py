@@ -0,0 +1,151 @@
+import os
+import random
+import signal
+import threading
+import time
+
+import numpy as np
+
+import main
+from conftest import check_hard_rules, load_builder, member
+
+
+def even_slots(count, groups):
+    base, rem = divmod(count, groups)
+    return [base + 1] * rem + [base] * (groups - rem)
+
+
+def builder_slots(builder):
+    males = sum(m['gender'] == '남' for m in builder.members)
+    return even_slots(males, builder.num_groups), even_slots(len(builder.members) - males, builder.num_groups)
+
+
+def test_total_score_is_sum_of_placement_scores(cohort):
+    builder = load_builder(*cohort[:2])
+    engine = main.ScoreEngine(builder.members, builder.num_groups, {}, builder.weights)
+    engine.reset(*builder_slots(builder))
+    placed = 0.0
+    for i in random.Random(0).sample(range(len(builder.members)), len(builder.members)):
+        scores = engine.scores(i)
+        g = int(np.argmax(scores))
+        if scores[g] == -np.inf: continue
+        placed += scores[g]
+        engine.place(i, g)
+    assert engine.total_score() == placed
+
+
+def test_pair_slots_keeps_totals_within_one():
+    for males, females in ((179, 121), (7, 3), (30, 0), (1, 58)):
+        male_slots, female_slots = even_slots(males, 10), even_slots(females, 10)
+        pairs = main.pair_slots(male_slots, female_slots)
+        assert sorted(m for m, _ in pairs) == sorted(male_slots) and sorted(f for _, f in pairs) == sorted(female_slots)
+        totals = [m + f for m, f in pairs]
+        assert max(totals) - min(totals) <= 1
+    assert main.pair_slots([3, 1], [0, 0]) is None  # 어떻게 짝지어도 총원 편차 2
+
+
+def test_parallel_search_does_not_depend_on_worker_count(cohort):
+    builder = load_builder(*cohort[:2])
+    engine = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    order = sorted(range(len(builder.members)), key=lambda i: builder.members[i]['birth_year'])
+    slot_pairs = main.pair_slots(*builder_slots(builder))
+
+    runs = [main.parallel_search(engine, slot_pairs, order, 40, workers, base_seed=1)
+            for workers in (2, 3)]
+    (feasible, best), (feasible2, best2) = runs
+    assert feasible == feasible2 > 0
+    assert best[:2] == best2[:2] and (best[2] == best2[2]).all()
+
+    score, _, assign, male_limit, female_limit = best
+    check_hard_rules(builder.members, assign, male_limit, female_limit)
+
+
+def greedy(builder, seed=0):
+    # 1~4차 그리디 배정이 성공할 때까지 시도하고 engine을 돌려줌
+    engine = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    order = sorted(range(len(builder.members)), key=lambda i: builder.members[i]['birth_year'])
+    slot_pairs = main.pair_slots(*builder_slots(builder))
+    rng = random.Random(seed)
+    for _ in range(builder.max_retries):
+        if main.run_attempt(engine, slot_pairs, order, rng):
+            return engine
+    raise AssertionError("배정 실패")
+
+
+def test_refine_improves_score_and_keeps_hard_rules(cohort):
+    builder = load_builder(*cohort[:2])
+    engine = greedy(builder)
+    violations = (engine.age_term[engine.birth, engine.assign] < 0).sum()
+
+    info = main.refine_assignment(engine, random.Random(0), iterations=5000)
+    assert info['end'] == engine.total_score() >= info['start'] and info['accepted'] > 0
+    assert (engine.age_term[engine.birth, engine.assign] < 0).sum() <= violations
+    check_hard_rules(builder.members, engine.assign, engine.male_limit, engine.female_limit)
+
+    # 교환마다 고친 카운터가 처음부터 다시 채운 것과 같아야 함
+    fresh = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    fresh.load(engine.assign, engine.male_limit, engine.female_limit)
+    for name in ('count', 'genders', 'majors', 'birth_years', 'new_cams'):
+        assert (getattr(fresh, name) == getattr(engine, name)).all()
+
+
+def test_refine_does_not_trade_violations():
+    # 2000년생 i는 1조(조장 2002년생)에 위반으로, 2001년생 j는 2조에 맞게 있음. 맞바꾸면 위반 수는 같지만
+    # 원래 맞는 조에 있던 j가 위반이 되므로 받지 않아야 함
+    members = [member('김가나', birth_year=2000, major='A'), member('이다라', birth_year=2001, major='B')]
+    engine = main.ScoreEngine(members, 2, {1: 2002, 2: 1999}, main.TeamBuilder().weights)
+    engine.reset([1, 1], [0, 0])
+    engine.place(0, 0)
+    engine.place(1, 1)
+    main.refine_assignment(engine, random.Random(0), iterations=200, start_temp=1e12)
+    assert engine.assign.tolist() == [0, 1]
+
+
+def test_refine_never_moves_members_into_ineligible_groups(tight_cohort):
+    builder = load_builder(*tight_cohort)
+    engine = greedy(builder)
+    blocked = ~engine.eligible
+    before = blocked[engine.birth, engine.assign]
+    main.refine_assignment(engine, random.Random(0), iterations=20000)
+    after = blocked[engine.birth, engine.assign]
+    assert not (after & ~before).any()
+    check_hard_rules(builder.members, engine.assign, engine.male_limit, engine.female_limit)
+
+
+def test_reset_reuses_buffers_and_matches_a_fresh_engine(cohort):
+    builder = load_builder(*cohort[:2])
+    engine = greedy(builder, seed=1)
+    buffers = {name: getattr(engine, name)
+               for name in ('count', 'genders', 'new_cams', 'assign', 'size_term', 'new_cam_term')}
+    limits = engine.male_limit.copy(), engine.female_limit.copy()
+    engine.reset(*limits)
+
+    fresh = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    fresh.reset(*limits)
+    for name in main.ScoreEngine.__slots__:
+        value = getattr(engine, name)
+        if isinstance(value, np.ndarray):
+            assert (value == getattr(fresh, name)).all(), name
+    assert all(getattr(engine, name) is arr for name, arr in buffers.items())
+    assert not any(engine.name_groups.values())
+
+
+def test_time_budget_keeps_the_best_feasible_attempt(cohort):
+    result = main.run_assignment(*cohort[:2], seed=0, save=False, cache_dir=None, time_budget=0.5)
+    assert result['success'] and not result['interrupted']
+    assert result['tried'] >= result['feasible'] > 1
+    assert result['seconds'] < 3
+
+
+def test_anytime_search_returns_best_so_far_on_ctrl_c(cohort):
+    builder = load_builder(*cohort[:2])
+    engine = main.ScoreEngine(builder.members, builder.num_groups, builder.leaders, builder.weights)
+    order = sorted(range(len(builder.members)), key=lambda i: builder.members[i]['birth_year'])
+    threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGINT)).start()
+
+    start = time.perf_counter()
+    tried, feasible, best, interrupted = main.anytime_search(engine, main.pair_slots(*builder_slots(builder)),
+                                                             order, 30, 1, base_seed=1)
+    assert interrupted and time.perf_counter() - start < 5
+    assert feasible > 0 and best is not None
+    check_hard_rules(builder.members, best[2], best[3], best[4])
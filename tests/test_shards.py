@@ -0,0 +1,20 @@
+import main
+from conftest import check_hard_rules, load_builder
+
+
+def test_split_groups_covers_every_group_once():
+    leaders = {g: 2000 + g % 5 for g in range(1, 24)}
+    blocks = main.split_groups(leaders, 23, 4)
+    assert sorted(g for block in blocks for g in block) == list(range(23))
+    assert max(map(len, blocks)) - min(map(len, blocks)) <= 1
+    assert sorted(main.split_groups(leaders, 3, 8)) == [[0], [1], [2]]  # 묶음이 조보다 많으면 조마다 하나
+
+
+def test_sharded_run_keeps_hard_rules_and_ignores_worker_count(cohort):
+    runs = [main.run_assignment(*cohort[:2], seed=6, save=False, cache_dir=None, shards=3, workers=workers)
+            for workers in (1, 2)]
+    assert runs[0]['success'] and runs[0]['shards']['shards'] == 3
+    assert runs[0]['assignments'] == runs[1]['assignments']
+
+    builder = load_builder(*cohort[:2])
+    check_hard_rules(builder.members, [runs[0]['assignments'][m['original_idx']] - 1 for m in builder.members])
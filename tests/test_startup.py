@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def python(*args):
+    done = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    return done.stdout
+
+
+def test_import_and_help_do_not_load_pandas_or_numpy():
+    loaded = "import sys, main; print('pandas' in sys.modules, 'numpy' in sys.modules)"
+    assert python('-c', loaded).split() == ['False', 'False']
+    assert 'run' in python('main.py', '--help')
+
+
+def test_missing_module_raises_a_friendly_error():
+    with pytest.raises(ImportError, match='pip install'):
+        main.require_module('no_such_module_for_test')
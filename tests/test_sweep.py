@@ -0,0 +1,55 @@
+import json
+import random
+
+import main
+
+
+def metrics(ratio=0.1, entropy=0.5, spread=1.0, singletons=5, violations=0):
+    return {'gender_ratio_dev': ratio, 'major_entropy_min': entropy, 'birth_mean_spread': spread,
+            'new_cam_singletons': singletons, 'age_violations': violations}
+
+
+def test_pareto_front_drops_dominated_and_failed_configs():
+    results = [{'metrics': m} for m in (
+        metrics(),                          # 0: 3번과 같음 (서로 지배하지 않음)
+        metrics(entropy=0.4),               # 1: 0번보다 엔트로피만 나쁨 -> 지배당함
+        metrics(ratio=0.05, singletons=9),  # 2: 성비는 좋고 신캠조 1명은 나쁨
+        metrics(),                          # 3
+        None,                               # 4: 가능한 배정 없음
+    )]
+    assert main.pareto_front(results) == [0, 2, 3]
+    assert main.pareto_front([{'metrics': None}]) == []
+
+
+def test_weight_grid_is_the_cartesian_product():
+    configs = main.weight_grid({'size': 100, 'major': 40}, {'major': [20, 60], 'gender': [10, 50, 90]})
+    assert len(configs) == 6 and all(c['size'] == 100 for c in configs)
+    assert {(c['major'], c['gender']) for c in configs} == {(m, g) for m in (20, 60) for g in (10, 50, 90)}
+
+
+def test_sweep_does_not_depend_on_worker_count(cohort):
+    configs = [{}, {'major': 120}, {'birth_year': 5, 'new_cam_cluster_bonus': 400}]
+    runs = [main.run_sweep(*cohort[:2], configs, attempts=8, workers=workers, seed=3, cache_dir=None)
+            for workers in (1, 2)]
+    strip = lambda results: [{k: v for k, v in r.items() if k != 'seconds'} for r in results]
+    assert strip(runs[0]) == strip(runs[1])
+    assert runs[0][1]['weights']['major'] == 120 and any(r['pareto'] for r in runs[0])
+
+
+def test_unseeded_sweep_reports_a_replayable_seed(cohort, tmp_path):
+    state = random.getstate()
+    summary = str(tmp_path / 'sweep.json')
+    assert main.main_cli(['sweep', '--leader', cohort[0], '--freshmen', cohort[1], '--samples', '2',
+                          '--attempts', '3', '--workers', '1', '--json', summary]) == 0
+    assert random.getstate() == state
+    with open(summary, encoding='utf-8') as f:
+        first = json.load(f)
+    seed = first[0]['seed']
+    assert all(r['seed'] == seed for r in first)
+
+    replay = str(tmp_path / 'replay.json')
+    assert main.main_cli(['sweep', '--leader', cohort[0], '--freshmen', cohort[1], '--samples', '2',
+                          '--attempts', '3', '--workers', '1', '--json', replay, '--seed', str(seed)]) == 0
+    with open(replay, encoding='utf-8') as f:
+        strip = lambda results: [{k: v for k, v in r.items() if k != 'seconds'} for r in results]
+        assert strip(json.load(f)) == strip(first)
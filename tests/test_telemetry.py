@@ -0,0 +1,33 @@
+import random
+
+import main
+from conftest import member
+
+WEIGHTS = main.TeamBuilder().weights
+
+
+def test_rejections_count_the_first_rule_in_scorer_order():
+    members = [member('김민준', birth_year=2000), member('박가나'), member('이민준', gender='여', new_cam=2)]
+    members += [member(f'최{k}호', gender='여') for k in range(3)]
+    engine = main.ScoreEngine(members, 4, {2: 2003}, WEIGHTS)
+    engine.reset([1, 2, 2, 2], [0, 1, 1, 3])
+    engine.place(1, 0)          # 1조: 총원 1명이 참
+    engine.place(2, 2)          # 3조: 같은 이름 키
+    for i in (3, 4, 5):
+        engine.place(i, 3)      # 4조: 같은 신캠조 3명
+    engine.telemetry = main.Telemetry()             # 2조: 조장 나이
+
+    assert engine.pick(0, random.Random(0)) == -1
+    assert engine.telemetry.rejections == {'total_cap': 1, 'gender_cap': 0, 'leader_age': 1,
+                                           'name_clash': 1, 'new_cam_cap': 1}
+
+
+def test_telemetry_does_not_change_the_result(cohort):
+    plain, traced = (main.run_assignment(*cohort[:2], seed=2, save=False, cache_dir=None, telemetry=flag)
+                     for flag in (False, True))
+    assert traced['assignments'] == plain['assignments']
+
+    tel = traced['telemetry']
+    assert tel['attempts'] == traced['attempts'] == tel['passes']['1']['runs']
+    assert tel['passes']['1']['members'] == traced['attempts'] * len(cohort[2])
+    assert set(tel['timers']) >= {'load_leaders', 'load_freshmen', 'search'}